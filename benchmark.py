@@ -0,0 +1,185 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from phpserialize import dumps  # type: ignore
+
+from lib import constants as C
+from lib.config import make_client
+from lib.DataSoup import BDXDataSoup
+from lib.FeedGenerator import BDXFeedGenerator
+from lib.PyBDXBuilder import PyBDX
+
+# feed sizes (plans) measured by default
+BENCH_SIZES = [1000, 5000, 20000]
+BENCH_KEY = "BENCH"
+
+
+def feedFiles(plans: int) -> Dict[str, Any]:
+    # generate (once) the previous and current synthetic feeds for a size
+    generator = BDXFeedGenerator.forPlans(plans)
+    feed_path = "%s/%s/%d" % (C.DATA_PATH, BENCH_KEY, plans)
+    if not os.path.exists(feed_path):
+        os.makedirs(feed_path)
+    files = {}
+    for date, shift in [("2023-01-01", 0), ("2023-01-02", 5000)]:
+        file = "%s/%s-%s.xml" % (feed_path, BENCH_KEY, date)
+        if not os.path.isfile(file):
+            generator.write(file, date=date, price_shift=shift)
+        files[date] = file
+    return {
+        "previous": files["2023-01-01"],
+        "current": files["2023-01-02"],
+        "plans": generator.numPlans(),
+        "settings": generator.clientSettings(BENCH_KEY),
+    }
+
+
+def stageIngest(feed: Dict[str, Any], client: Any) -> Callable:
+    return lambda: BDXDataSoup(feed["current"], client)
+
+
+def stageIngestStream(feed: Dict[str, Any], client: Any) -> Callable:
+    return lambda: BDXDataSoup(feed["current"], client, stream=True)
+
+
+def stageDiff(feed: Dict[str, Any], client: Any) -> Callable:
+    previous = BDXDataSoup(feed["previous"], client, stream=True)
+    current = BDXDataSoup(feed["current"], client, stream=True)
+    return lambda: PyBDX.calcPricingChanges(previous, current)
+
+
+def stageGetDict(feed: Dict[str, Any], client: Any) -> Callable:
+    soup = BDXDataSoup(feed["current"], client, stream=True)
+    records = soup.raw["builders"] + soup.raw["subdivs"] + soup.raw["plans"]
+    return lambda: [record.getDict() for record in records]
+
+
+def reflectiveGetDict(obj: object) -> Dict[str, Any]:
+    # the reflective getDict the compiled serializers replaced, as a baseline
+    tmp_dict = {}
+    data_attrs = [
+        a
+        for a in dir(obj)
+        if not a.startswith("_") and not callable(getattr(obj, a, None))
+    ]
+    for attribute in data_attrs:
+        if getattr(obj, attribute, None):
+            tmp_attr = getattr(obj, attribute)
+            if type(tmp_attr) is list:
+                tmp_dict[attribute] = dumps(tmp_attr).decode("utf-8")
+            else:
+                tmp_dict[attribute] = tmp_attr
+    return tmp_dict
+
+
+def stageGetDictReflective(feed: Dict[str, Any], client: Any) -> Callable:
+    soup = BDXDataSoup(feed["current"], client, stream=True)
+    records = soup.raw["builders"] + soup.raw["subdivs"] + soup.raw["plans"]
+    return lambda: [reflectiveGetDict(record) for record in records]
+
+
+def stageSaveCSV(feed: Dict[str, Any], client: Any) -> Callable:
+    soup = BDXDataSoup(feed["current"], client, stream=True)
+    csv_file = "%s/%s-plans-bench.csv" % (os.path.dirname(feed["current"]), BENCH_KEY)
+    return lambda: PyBDX.writeCSV(csv_file, soup.json["plans"], soup.fields("plans"))
+
+
+BENCH_STAGES: Dict[str, Callable] = {
+    "ingest": stageIngest,
+    "ingest_stream": stageIngestStream,
+    "diff": stageDiff,
+    "getDict": stageGetDict,
+    "getDict_reflective": stageGetDictReflective,
+    "saveJSONtoCSV": stageSaveCSV,
+}
+
+
+def measure(stage: str, feed: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    # runs in a fresh process, so peak memory belongs to this stage alone
+    client = make_client(feed["settings"])
+    run = BENCH_STAGES[stage](feed, client)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # one more (slower) traced run for the python heap peak
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "stage": stage,
+        "plans": feed["plans"],
+        "repeat": repeat,
+        "seconds": round(min(times), 4),
+        "seconds_mean": round(sum(times) / len(times), 4),
+        "us_per_plan": round(min(times) / feed["plans"] * 1000000, 2),
+        "peak_python_mib": round(peak / 1024 / 1024, 2),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_growth_mib": round((rss_after - rss_before) / 1024, 2),
+    }
+
+
+def runBenchmarks(
+    sizes: List[int], stages: List[str], repeat: int = 3
+) -> Dict[str, Any]:
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for plans in sizes:
+        feed = feedFiles(plans)
+        for stage in stages:
+            with context.Pool(1, maxtasksperchild=1) as pool:
+                result = pool.apply(measure, (stage, feed, repeat))
+            print(
+                "%-18s %7d plans %9.4fs %9.2fus/plan %9.2f MiB"
+                % (
+                    stage,
+                    feed["plans"],
+                    result["seconds"],
+                    result["us_per_plan"],
+                    result["peak_python_mib"],
+                )
+            )
+            results.append(result)
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PyBDX ingest benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCH_SIZES)
+    parser.add_argument(
+        "--stages", nargs="+", default=list(BENCH_STAGES), choices=BENCH_STAGES
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="%s/_bench" % (C.DATA_PATH))
+    parser.add_argument("--keep", action="store_true", help="keep generated feeds")
+    args = parser.parse_args()
+    report = runBenchmarks(args.sizes, args.stages, args.repeat)
+    if not os.path.exists(args.output):
+        os.makedirs(args.output)
+    output_file = "%s/benchmark-%s.json" % (
+        args.output,
+        datetime.now().strftime("%Y-%m-%d-%H%M%S"),
+    )
+    with open(output_file, "w") as output:
+        json.dump(report, output, indent=2)
+    print("saved %s" % (output_file))
+    if not args.keep:
+        shutil.rmtree("%s/%s" % (C.DATA_PATH, BENCH_KEY), ignore_errors=True)
@@ -0,0 +1,90 @@
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from lib.config import BDX_REPORT_METRICS
+from lib.PyBDXBuilder import PyBDX
+
+
+# ----------------------------------------------------------------------------------------
+# MULTI CLIENT run orchestrator
+def runClient(
+    client: Any,
+    download: bool = True,
+    analyze: bool = True,
+    convert: bool = True,
+    upload: bool = False,
+) -> Dict[str, Any]:
+    """run the full PyBDX pipeline and pricing report for one client"""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {
+        "client": client.CLIENT_NAME,
+        "key": client.BDX_FEED_XML_FILE_ID,
+        "ok": False,
+        "report": [],
+        "error": None,
+        "metrics": None,
+        "seconds": 0.0,
+    }
+    try:
+        BDX = PyBDX(
+            client=client,
+            download=download,
+            analyze=analyze,
+            convert=convert,
+            upload=upload,
+        )
+        BDX.pricingReport(result["report"])
+        result["metrics"] = BDX.metrics_file
+        if BDX_REPORT_METRICS:
+            result["report"].append(BDX.metrics.summary())
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = "%s: %s" % (type(e).__name__, e)
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def runClients(
+    clients: List[Any], max_workers: int = 4, **options: Any
+) -> Dict[str, Any]:
+    """run every client in a process pool, and aggregate their reports"""
+    started = time.perf_counter()
+    # each client works in its own data directory, keyed by its feed id
+    keys = [client.BDX_FEED_XML_FILE_ID for client in clients]
+    if len(set(keys)) != len(keys):
+        raise ValueError("BDX_FEED_XML_FILE_ID must be unique per client")
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(runClient, client, **options) for client in clients]
+        results = [future.result() for future in futures]
+    return {
+        "clients": results,
+        "ok": sum(1 for result in results if result["ok"]),
+        "failed": sum(1 for result in results if not result["ok"]),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def formatReport(report: Dict[str, Any]) -> str:
+    """one text report for every client run"""
+    output = [
+        "%d clients: %d ok, %d failed in %.1fs"
+        % (len(report["clients"]), report["ok"], report["failed"], report["seconds"])
+    ]
+    for result in report["clients"]:
+        output.append(16 * "====")
+        output.append(
+            "%s (%s) %s in %.1fs"
+            % (
+                result["client"],
+                result["key"],
+                "ok" if result["ok"] else "FAILED",
+                result["seconds"],
+            )
+        )
+        output.extend(result["report"])
+        if result["error"]:
+            output.append("ERROR: %s" % (result["error"]))
+    return "\n".join(output)
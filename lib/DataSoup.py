@@ -1,16 +1,165 @@
+import copy
+import hashlib
+import json
 import math
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
+from zipfile import ZipFile
 
-from bs4 import BeautifulSoup
+import pandas as pd
+from bs4 import BeautifulSoup, Tag
+from lxml import etree  # type: ignore
 
 from lib import constants as C
 from lib import utilities as UT
 
+# bump when record output changes, to invalidate cached soup snapshots
+PARSER_VERSION = 2
+
+
+# ----------------------------------------------------------------------------------------
+# ELEMENT wrapper for streamed lxml nodes
+class BDXElement:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<BDXElement %s>" % (self.name)
+
+    def __init__(self, elm: Any) -> None:
+        """wraps an lxml element with the BeautifulSoup tag api the data classes use"""
+        self.elm = elm
+        self.name = localName(elm.tag)
+        self.attrs = elm.attrib
+
+    def __bool__(self) -> bool:
+        """a tag is truthy even when it has no children (matches bs4)"""
+        return True
+
+    @property
+    def text(self) -> str:
+        """all descendant text, like bs4 Tag.text"""
+        return "".join(self.elm.itertext())
+
+    @property
+    def descendants(self) -> Iterator[Any]:
+        """all descendant tags in document order"""
+        for elm in self.elm.iterdescendants():
+            yield BDXElement(elm)
+
+    def find(self, name: str) -> Any:
+        """first descendant tag matching name, or None"""
+        for elm in self.elm.iterdescendants():
+            if localName(elm.tag) == name:
+                return BDXElement(elm)
+        return None
+
+    def findChildren(self, name: str, recursive: bool = True) -> List[Any]:
+        """all descendant (or direct child) tags matching name"""
+        nodes = self.elm.iterdescendants() if recursive else self.elm.iterchildren()
+        return [BDXElement(elm) for elm in nodes if localName(elm.tag) == name]
+
+
+# ----------------------------------------------------------------------------------------
+# TAG MAP single pass element index
+class TagMap:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<TagMap %s (%d tags)>" % (self.name, len(self.tags))
+
+    def __init__(self, data: Any) -> None:
+        """lazily indexes an element's descendant tags by name in one walk"""
+        self.data = data
+        self.name = data.name
+        self.attrs = data.attrs
+        self.tags: Dict[str, List[Any]] = {}
+        self._walk = (
+            node for node in data.descendants if isinstance(node, (Tag, BDXElement))
+        )
+
+    def __bool__(self) -> bool:
+        """a tag is truthy even when it has no children (matches bs4)"""
+        return True
+
+    @property
+    def text(self) -> str:
+        """all descendant text of the indexed element"""
+        return self.data.text
+
+    def index(self, name: str | None = None) -> Any:
+        """walk on until the named tag is found, or to the end of the element"""
+        for node in self._walk:
+            self.tags.setdefault(node.name, []).append(node)
+            if node.name == name:
+                return node
+        return None
+
+    def find(self, name: str) -> Any:
+        """first descendant tag matching name, or None"""
+        found = self.tags.get(name)
+        if found:
+            return found[0]
+        return self.index(name)
+
+    def findChildren(self, name: str, recursive: bool = True) -> List[Any]:
+        """all descendant (or direct child) tags matching name"""
+        if not recursive:
+            return self.data.findChildren(name, recursive=False)
+        self.index()
+        return self.tags.get(name, [])
+
+
+def localName(tag: Any) -> str:
+    """strip any {namespace} from an lxml tag"""
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def freeElement(elm: Any) -> None:
+    """drop a processed lxml subtree and any already processed siblings"""
+    elm.clear()
+    parent = elm.getparent()
+    if parent is not None:
+        while elm.getprevious() is not None:
+            del parent[0]
+
+
+def builderHead(elm: Any) -> bytes:
+    """a Builder element with its own fields, without its subdivisions"""
+    head = etree.Element(elm.tag, elm.attrib, nsmap=elm.nsmap)
+    for child in elm:
+        if localName(child.tag) != "Subdivision":
+            head.append(copy.deepcopy(child))
+    return etree.tostring(head)
+
+
+def ingestShard(head: bytes, subdivs: List[bytes], company: Any, client: Any) -> Tuple:
+    """build a Builder and the given Subdivision subtrees (in a worker process)"""
+    slugs = UT.getWPIDMatcher(client.WP_CPT_SLUG_ID)
+    this_builder = Builder(
+        BDXElement(etree.fromstring(head)),
+        company=company,
+        clientSlugs=slugs,
+    )
+    parts = [
+        BDXDataSoup.buildSubdivision(
+            BDXElement(etree.fromstring(subdiv)),
+            company,
+            this_builder,
+            slugs,
+            client.NAME_FILTER_LIST,
+        )
+        for subdiv in subdivs
+    ]
+    return this_builder, parts
+
 
 # ----------------------------------------------------------------------------------------
 # NODE base data class
 class Node:
+    __slots__ = ("id", "number", "name")
+
     def __repr__(self) -> str:
         """representation"""
         return '<Node BDX id="%s">' % (self.id)
@@ -29,7 +178,8 @@ class Node:
             return value.replace("\n", "<br>")
 
     def getDataBool(self, data: Any, tag_name: Any) -> Any:
-        if data.find(tag_name) and data.find(tag_name).text == 0:
+        tag_data = data.find(tag_name)
+        if tag_data and tag_data.text == 0:
             return 1
         else:
             return 0
@@ -38,12 +188,15 @@ class Node:
 # ----------------------------------------------------------------------------------------
 # COMPANY data class
 class Company(Node):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         """representation"""
         return "<Company %s>" % (self.name)
 
     def __init__(self, data: Any) -> None:
         """constructor"""
+        data = TagMap(data)
         Node.__init__(
             self,
             data.attrs["CorporationID"],
@@ -59,6 +212,22 @@ class Company(Node):
 # ----------------------------------------------------------------------------------------
 # BUILDER data class
 class Builder(Node):
+    __slots__ = (
+        "subdivs",
+        "plans",
+        "slug",
+        "wp_cpt_id",
+        "corp_id",
+        "corp_name",
+        "corp_number",
+        "site",
+        "leads_email",
+        "logo_md",
+        "logo_sm",
+        "reporting_name",
+        "copy_leads_email",
+    )
+
     def __repr__(self) -> str:
         """representation"""
         return "<Builder %s (%s)>" % (self.name, self.wp_cpt_id)
@@ -69,6 +238,7 @@ class Builder(Node):
         self.subdivs: List = []
         self.plans: List = []
         # data attrs
+        data = TagMap(data)
         Node.__init__(
             self,
             data.attrs["BuilderID"],
@@ -104,6 +274,35 @@ class Builder(Node):
 # ----------------------------------------------------------------------------------------
 # SUBDIVISION data class
 class Subdivision(Node):
+    __slots__ = (
+        "builder",
+        "plans",
+        "slug",
+        "wp_cpt_id",
+        "status",
+        "style",
+        "link_site",
+        "link_design_center",
+        "link_video_tour",
+        "price_low",
+        "price_high",
+        "size_low",
+        "size_high",
+        "directions",
+        "description",
+        "headline",
+        "leads_email",
+        "geotag",
+        "address",
+        "office_geotag",
+        "office_address",
+        "office_hours",
+        "agents",
+        "office_phone",
+        "schools",
+        "_images",
+    )
+
     def __repr__(self) -> str:
         """representation"""
         return "<Subdivision %s (%s)>" % (self.name, self.wp_cpt_id)
@@ -116,6 +315,7 @@ class Subdivision(Node):
         self.builder: List = []
         self.plans: List = []
         # data attrs
+        data = TagMap(data)
         Node.__init__(
             self,
             data.attrs["SubdivisionID"],
@@ -162,6 +362,7 @@ class Subdivision(Node):
             geocode = elm.findChildren("SubGeocode")
             geoloc = []
             for coord in geocode:
+                coord = TagMap(coord)
                 geoloc.append(Node.getDataTag(self, coord, "SubLatitude"))
                 geoloc.append(Node.getDataTag(self, coord, "SubLongitude"))
         # set the Subdiv geotag
@@ -179,6 +380,7 @@ class Subdivision(Node):
         """format office data"""
         office_data = data.findChildren("SalesOffice", recursive=False)
         for office in office_data:
+            office = TagMap(office)
             sales_agents = office.findChildren("Agent")
             sales_hours = office.find("Hours")
             phone_raw = office.findChildren("Phone")
@@ -193,6 +395,7 @@ class Subdivision(Node):
                 geocode = elm.findChildren("Geocode")
                 geoloc = []
                 for coord in geocode:
+                    coord = TagMap(coord)
                     geoloc.append(Node.getDataTag(self, coord, "Latitude"))
                     geoloc.append(Node.getDataTag(self, coord, "Longitude"))
             # set the office geotag
@@ -230,6 +433,7 @@ class Subdivision(Node):
             self.office_phone = ""
             if phone_raw:
                 for itm in phone_raw:
+                    itm = TagMap(itm)
                     c_area = Node.getDataTag(self, itm, "AreaCode")
                     c_pre = Node.getDataTag(self, itm, "Prefix")
                     c_suf = Node.getDataTag(self, itm, "Suffix")
@@ -242,11 +446,11 @@ class Subdivision(Node):
         # loop school district locations
         if len(school_data) > 0:
             for school in school_data:
+                school = TagMap(school)
                 data_obj = {}
+                district_name = school.find("DistrictName")
                 district = (
-                    school.find("DistrictName").text.strip()
-                    if school.find("DistrictName") is not None
-                    else ""
+                    district_name.text.strip() if district_name is not None else ""
                 )
                 elementary = school.findChildren("Elementary")
                 middle = school.findChildren("Middle")
@@ -301,6 +505,41 @@ class Subdivision(Node):
 # ----------------------------------------------------------------------------------------
 # PLAN data class
 class Plan(Node):
+    __slots__ = (
+        "builder",
+        "subdiv",
+        "slug",
+        "wp_slug",
+        "wp_cpt_id",
+        "headline",
+        "description",
+        "available",
+        "actual_price",
+        "base_price",
+        "base_sqft",
+        "link_site",
+        "link_nhs",
+        "link_model_tour",
+        "link_design_center",
+        "num_stories",
+        "num_baths",
+        "num_bedrooms",
+        "num_car_garage",
+        "num_dining_areas",
+        "has_basement",
+        "num_living_areas",
+        "num_amenities",
+        "leads_phone",
+        "leads_email",
+        "hours",
+        "address",
+        "featured_image",
+        "_images",
+        "_elevations",
+        "_floorplans",
+        "_interiors",
+    )
+
     def __repr__(self) -> str:
         """representation"""
         return "<Plan %s (%s)>" % (self.name, self.wp_cpt_id)
@@ -318,12 +557,15 @@ class Plan(Node):
         # relationships
         self.builder: List = []
         self.subdiv: List = []
+        data = TagMap(data)
         p_number = ""
-        if data.find("PlanNumber") and data.find("PlanNumber").text:
-            p_number = (data.find("PlanNumber").text.strip(),)
+        plan_number = data.find("PlanNumber")
+        if plan_number and plan_number.text:
+            p_number = (plan_number.text.strip(),)
         p_name = ""
-        if data.find("PlanName") and data.find("PlanName").text:
-            p_name_tup = data.find("PlanName").text
+        plan_name = data.find("PlanName")
+        if plan_name and plan_name.text:
+            p_name_tup = plan_name.text
             p_name = p_name_tup.strip()
         # data attrs
         Node.__init__(
@@ -404,6 +646,7 @@ class Plan(Node):
         self._interiors: List[Any] = []
         all_images = data.findChildren("PlanImages")
         for img in all_images:
+            img = TagMap(img)
             elv_img_data = img.findChildren("ElevationImage")
             fp_img_data = img.findChildren("FloorPlanImage")
             int_img_data = img.findChildren("InteriorImage")
@@ -434,6 +677,55 @@ class Plan(Node):
         return UT.getDict(self)
 
 
+# json data key -> record class
+RECORD_TYPES = {"builders": Builder, "subdivs": Subdivision, "plans": Plan}
+# column dtypes of the typed tables, every other column is text; counts and
+# prices are nullable integers, so a blank doesn't turn a column into floats
+RECORD_DTYPES: Dict[str, Dict[str, str]] = {
+    "builders": {},
+    "subdivs": {
+        "price_low": "Int64",
+        "price_high": "Int64",
+        "size_low": "Int64",
+        "size_high": "Int64",
+    },
+    "plans": {
+        "actual_price": "Int64",
+        "base_price": "Int64",
+        "base_sqft": "float64",
+        # half stories and half baths
+        "num_stories": "float64",
+        "num_baths": "float64",
+        "num_bedrooms": "Int64",
+        "num_car_garage": "Int64",
+        "num_dining_areas": "Int64",
+        "num_living_areas": "Int64",
+        "num_amenities": "Int64",
+        "available": "bool",
+        "has_basement": "bool",
+    },
+}
+
+
+def typeColumns(table: pd.DataFrame, data_key: str) -> pd.DataFrame:
+    # cast the columns of a data key to their dtypes, from json values or csv
+    # text alike, so a column has the same dtype in every day's table
+    dtypes = RECORD_DTYPES.get(data_key, {})
+    for field in map(str, table.columns):
+        dtype = dtypes.get(field)
+        if dtype is None:
+            table[field] = table[field].fillna("").astype(str)
+        elif dtype == "bool":
+            table[field] = table[field].isin([True, "True"])
+        else:
+            values = pd.to_numeric(table[field], errors="coerce").astype("float64")
+            if dtype == "Int64":
+                # like unparseable text, a fraction is missing from an integer
+                values = values.where(values % 1 == 0)
+            table[field] = values.astype(pd.api.types.pandas_dtype(dtype))
+    return table
+
+
 # ----------------------------------------------------------------------------------------
 # BDX data wrangler
 class BDXDataSoup:
@@ -445,11 +737,28 @@ class BDXDataSoup:
             self.date,
         )
 
-    def __init__(self, data_file: Any, client: Any) -> None:
+    def __init__(
+        self,
+        data_file: Any,
+        client: Any,
+        stream: bool = False,
+        cache: Any = None,
+        previous: Any = None,
+        full: bool = False,
+        workers: int = 0,
+    ) -> None:
         """constructor"""
         self.raw: Dict[str, Any] = {"builders": [], "subdivs": [], "plans": []}
         self.json: Dict[str, Any] = {"builders": [], "subdivs": [], "plans": []}
+        self.index: Dict[str, Dict] = {"builders": {}, "subdivs": {}, "plans": {}}
+        # subdivision subtree hash -> (subdiv, plans, subdiv json, plans json)
+        self.parts: Dict[str, Tuple] = {}
+        self.previous_parts: Dict[str, Tuple] = {}
+        if previous is not None and not full:
+            self.previous_parts = previous.parts
         self.client: Any = client
+        # the client slug map, compiled once for every record of this soup
+        self.slugs = UT.getWPIDMatcher(client.WP_CPT_SLUG_ID)
         self.file_name: str = data_file.split("/")[-1]
         self.cid: str = ""
         self.date: Any
@@ -461,12 +770,132 @@ class BDXDataSoup:
         else:
             self.cid = file[0]
             self.date = datetime.now().strftime("%Y/%m/%d")
-        # open the xml data file
-        with open(data_file, "r") as raw_xml:
-            content = "".join(raw_xml.readlines()).encode("UTF-8")
-            soup = BeautifulSoup(content, "xml")
-            # wrangle BDX data
-            self.ingest(soup)
+        # load a compiled snapshot of this data file, or wrangle it
+        if cache is None or not cache.load(self, data_file):
+            # read the xml member straight from a zipped feed snapshot
+            if data_file.endswith(".zip"):
+                with ZipFile(data_file, "r") as archive:
+                    with archive.open(self.zipMember(archive), "r") as raw_xml:
+                        if stream:
+                            self.ingestStream(raw_xml, workers)
+                        else:
+                            self.ingest(BeautifulSoup(raw_xml.read(), "xml"))
+            # stream the xml data file subtree by subtree
+            elif stream:
+                self.ingestStream(data_file, workers)
+            else:
+                # map the xml data file read-only, the parser reads it in place
+                with open(data_file, "rb") as raw_xml:
+                    with mmap.mmap(
+                        raw_xml.fileno(), 0, access=mmap.ACCESS_READ
+                    ) as content:
+                        soup = BeautifulSoup(content, "xml")
+                # wrangle BDX data
+                self.ingest(soup)
+            # save a compiled snapshot of this data file
+            if cache is not None:
+                cache.save(self, data_file)
+        # index the wrangled records for lookups
+        self.previous_parts = {}
+        self.buildIndex()
+
+    @staticmethod
+    def fields(data_key: str) -> List[str]:
+        """column names of a json data key, from its record schema"""
+        return UT.getFields(RECORD_TYPES[data_key])
+
+    def table(self, data_key: str) -> pd.DataFrame:
+        """typed columnar view of a json data key, one column per schema field"""
+        fields = self.fields(data_key)
+        table = pd.DataFrame.from_records(self.json[data_key], columns=fields)
+        return typeColumns(table, data_key)
+
+    def partSalt(self) -> bytes:
+        """parser version and client filters, which every part key depends on"""
+        return json.dumps(
+            [
+                PARSER_VERSION,
+                self.client.WP_CPT_SLUG_ID,
+                self.client.NAME_FILTER_LIST,
+            ],
+            sort_keys=True,
+        ).encode("utf-8")
+
+    @staticmethod
+    def builderHash(salt: bytes, elm: Any, company: Any) -> bytes:
+        """hash of a builder's own fields and its company"""
+        digest = hashlib.sha256(salt)
+        digest.update(repr([company.id, company.number, company.name]).encode("utf-8"))
+        digest.update(repr(sorted(elm.attrib.items())).encode("utf-8"))
+        for child in elm:
+            if localName(child.tag) != "Subdivision":
+                digest.update(etree.tostring(child))
+        return digest.digest()
+
+    @staticmethod
+    def subdivisionHash(builder_hash: bytes, elm: Any) -> str:
+        """hash of a subdivision subtree under a builder"""
+        digest = hashlib.sha256(builder_hash)
+        digest.update(etree.tostring(elm))
+        return digest.hexdigest()
+
+    @staticmethod
+    def zipMember(archive: ZipFile) -> str:
+        """name of the BDX xml feed inside a zip archive"""
+        for name in archive.namelist():
+            if name.lower().endswith(".xml"):
+                return name
+        raise FileNotFoundError("no xml feed in %s" % (archive.filename))
+
+    @staticmethod
+    def planKey(plan: Any) -> Tuple[Any, ...]:
+        """plan lookup key: name, builder and subdiv relationships"""
+        return (plan.name, tuple(plan.builder), tuple(plan.subdiv))
+
+    def buildIndex(self) -> None:
+        """index plans by plan key, and builders and subdivs by WP ID"""
+        for builder in self.raw["builders"]:
+            self.index["builders"].setdefault(builder.wp_cpt_id, builder)
+        for subdiv in self.raw["subdivs"]:
+            self.index["subdivs"].setdefault(subdiv.wp_cpt_id, subdiv)
+        for plan in self.raw["plans"]:
+            self.index["plans"].setdefault(self.planKey(plan), plan)
+
+    def planTable(self) -> pd.DataFrame:
+        """columnar view of the plans, one row per plan in document order"""
+        columns: Dict[str, List[Any]] = {
+            "id": [],
+            "name": [],
+            "builder": [],
+            "subdiv": [],
+            "builder_name": [],
+            "subdiv_name": [],
+            "actual_price": [],
+            "base_price": [],
+            "base_sqft": [],
+        }
+        for plan in self.raw["plans"]:
+            builder = (
+                self.index["builders"].get(plan.builder[0]) if plan.builder else None
+            )
+            subdiv = self.index["subdivs"].get(plan.subdiv[0]) if plan.subdiv else None
+            columns["id"].append(plan.id)
+            columns["name"].append(plan.name)
+            columns["builder"].append(tuple(plan.builder))
+            columns["subdiv"].append(tuple(plan.subdiv))
+            columns["builder_name"].append(builder.name if builder else None)
+            columns["subdiv_name"].append(subdiv.name if subdiv else None)
+            columns["actual_price"].append(plan.actual_price)
+            columns["base_price"].append(plan.base_price)
+            columns["base_sqft"].append(plan.base_sqft)
+        # object columns keep None (missing builder/subdiv) instead of NaN
+        table = pd.DataFrame(
+            {key: pd.Series(values, dtype=object) for key, values in columns.items()}
+        )
+        table["actual_price"] = table["actual_price"].astype("int64")
+        table["base_price"] = table["base_price"].astype("int64")
+        table["base_sqft"] = pd.to_numeric(table["base_sqft"], errors="coerce")
+        return table
 
     def ingest(self, data_soup: Any) -> bool:
         """ingestion controller handles data wrangler loop (the magic ✨)"""
@@ -484,61 +913,258 @@ class BDXDataSoup:
                 this_builder = Builder(
                     builder,
                     company=this_company,
-                    clientSlugs=self.client.WP_CPT_SLUG_ID,
+                    clientSlugs=self.slugs,
                 )
-                # print( this_builder.name )
                 # Subdivision xml
                 subdivs = builder.findChildren("Subdivision", recursive=False)
                 for subdiv in subdivs:
-                    # Subdivision data
-                    this_subdiv = Subdivision(
-                        subdiv,
-                        company=this_company,
-                        builder=this_builder,
-                        clientSlugs=self.client.WP_CPT_SLUG_ID,
-                        filterList=self.client.NAME_FILTER_LIST,
-                    )
-                    # print( this_subdiv.name )
-                    # Data relationships
-                    this_builder.addRelationship(
-                        "subdivs", this_subdiv.wp_cpt_id
-                    )  # Builder Relationship
-                    this_subdiv.addRelationship(
-                        "builder", this_builder.wp_cpt_id
-                    )  # Subdiv Relationship
-                    # Plan xml
-                    plans = subdiv.findChildren("Plan", recursive=False)
-                    for plan in plans:
-                        # Plan data
-                        this_plan = Plan(
-                            plan,
+                    self.addSubdivision(subdiv, this_company, this_builder)
+                # add BUILDER to dataset
+                self.addBuilder(this_builder)
+        # return True after ingest func wrangles all datasets
+        return True
+
+    def ingestStream(self, data_file: Any, workers: int = 0) -> bool:
+        """streaming ingestion controller, builds records as each subtree closes"""
+        if workers > 1:
+            return self.ingestParallel(data_file, workers)
+        this_company: Company | None = None
+        this_builder: Builder | None = None
+        builder_hash = b""
+        salt = self.partSalt()
+        path: List[str] = []
+        context = etree.iterparse(
+            data_file,
+            events=("start", "end"),
+            remove_comments=True,
+            remove_pis=True,
+            huge_tree=True,
+        )
+        for event, elm in context:
+            tag = localName(elm.tag)
+            if event == "start":
+                parent = path[-1] if path else ""
+                path.append(tag)
+                # Company fields precede its first Builder
+                if tag == "Builder" and parent == "Corporation":
+                    if this_company is None:
+                        this_company = Company(BDXElement(elm.getparent()))
+                    this_builder = None
+                # Builder fields precede its first Subdivision
+                elif tag == "Subdivision" and parent == "Builder":
+                    if this_builder is None:
+                        this_builder = Builder(
+                            BDXElement(elm.getparent()),
                             company=this_company,
-                            builder=this_builder,
-                            subdiv=this_subdiv,
-                            clientSlugs=self.client.WP_CPT_SLUG_ID,
-                            filterList=self.client.NAME_FILTER_LIST,
+                            clientSlugs=self.slugs,
                         )
-                        # Data relationships
-                        this_builder.addRelationship(
-                            "plans", this_plan.wp_cpt_id
-                        )  # Builder-Plan Relationship
-                        this_subdiv.addRelationship(
-                            "plans", this_plan.wp_cpt_id
-                        )  # Subdiv-Plan Relationship
-                        this_plan.addRelationship(
-                            "builder", this_builder.wp_cpt_id
-                        )  # Plan-Builder Relationship
-                        this_plan.addRelationship(
-                            "subdiv", this_subdiv.wp_cpt_id
-                        )  # Plan-Subdiv Relationship
-                        # add PLAN to dataset
-                        self.raw["plans"].append(this_plan)
-                        self.json["plans"].append(this_plan.getDict())
-                    # add SUBDIVISION to dataset
-                    self.raw["subdivs"].append(this_subdiv)
-                    self.json["subdivs"].append(this_subdiv.getDict())
-                # add BUILDER to dataset
-                self.raw["builders"].append(this_builder)
-                self.json["builders"].append(this_builder.getDict())
+                        builder_hash = self.builderHash(
+                            salt, elm.getparent(), this_company
+                        )
+                continue
+            path.pop()
+            parent = path[-1] if path else ""
+            # Subdivision subtree closed, build it and its plans then free it
+            if tag == "Subdivision" and parent == "Builder":
+                part_key = self.subdivisionHash(builder_hash, elm)
+                part = self.previous_parts.get(part_key)
+                # unchanged subtree, reuse the previous snapshot's records
+                if part is not None:
+                    self.reuseSubdivision(part, this_builder)
+                else:
+                    part = self.addSubdivision(
+                        BDXElement(elm), this_company, this_builder
+                    )
+                self.parts[part_key] = part
+                freeElement(elm)
+            # Builder subtree closed
+            elif tag == "Builder" and parent == "Corporation":
+                if this_builder is None:
+                    this_builder = Builder(
+                        BDXElement(elm),
+                        company=this_company,
+                        clientSlugs=self.slugs,
+                    )
+                self.addBuilder(this_builder)
+                this_builder = None
+                freeElement(elm)
+            # Company subtree closed
+            elif tag == "Corporation":
+                this_company = None
+                freeElement(elm)
+        del context
+        # return True after ingest func wrangles all datasets
+        return True
+
+    def ingestParallel(self, data_file: Any, workers: int) -> bool:
+        """streaming ingestion, with each Builder subtree built in a worker process
+
+        the parse, subtree hashes and reuse of unchanged subdivisions stay in this
+        process; results are merged back in document order as they complete
+        """
+        this_company: Company | None = None
+        shard: Dict[str, Any] = {}
+        builder_hash = b""
+        salt = self.partSalt()
+        path: List[str] = []
+        pending: List[Tuple[Any, List[str]]] = []
+        context = etree.iterparse(
+            data_file,
+            events=("start", "end"),
+            remove_comments=True,
+            remove_pis=True,
+            huge_tree=True,
+        )
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for event, elm in context:
+                tag = localName(elm.tag)
+                if event == "start":
+                    parent = path[-1] if path else ""
+                    path.append(tag)
+                    # Company fields precede its first Builder
+                    if tag == "Builder" and parent == "Corporation":
+                        if this_company is None:
+                            this_company = Company(BDXElement(elm.getparent()))
+                        shard = {"head": None, "subdivs": [], "keys": []}
+                    # Builder fields precede its first Subdivision
+                    elif tag == "Subdivision" and parent == "Builder":
+                        if shard["head"] is None:
+                            shard["head"] = builderHead(elm.getparent())
+                            builder_hash = self.builderHash(
+                                salt, elm.getparent(), this_company
+                            )
+                    continue
+                path.pop()
+                parent = path[-1] if path else ""
+                # Subdivision subtree closed, queue it unless it is unchanged
+                if tag == "Subdivision" and parent == "Builder":
+                    part_key = self.subdivisionHash(builder_hash, elm)
+                    if part_key not in self.previous_parts:
+                        shard["subdivs"].append(etree.tostring(elm, with_tail=False))
+                    shard["keys"].append(part_key)
+                    freeElement(elm)
+                # Builder subtree closed, build it in the pool
+                elif tag == "Builder" and parent == "Corporation":
+                    # a Builder without subdivisions is its own head
+                    head = shard["head"] or builderHead(elm)
+                    future = pool.submit(
+                        ingestShard,
+                        head,
+                        shard["subdivs"],
+                        this_company,
+                        self.client,
+                    )
+                    pending.append((future, shard["keys"]))
+                    freeElement(elm)
+                    # merge finished builders in order, to keep memory flat
+                    while pending and pending[0][0].done():
+                        self.mergeShard(*pending.pop(0))
+                # Company subtree closed
+                elif tag == "Corporation":
+                    this_company = None
+                    freeElement(elm)
+            del context
+            while pending:
+                self.mergeShard(*pending.pop(0))
         # return True after ingest func wrangles all datasets
         return True
+
+    def mergeShard(self, future: Any, keys: List[str]) -> None:
+        """add a worker built Builder subtree to the dataset, in document order"""
+        this_builder, built = future.result()
+        built = iter(built)
+        # relationships are replayed in document order, reused parts included
+        this_builder.subdivs = []
+        this_builder.plans = []
+        for part_key in keys:
+            part = self.previous_parts.get(part_key)
+            if part is None:
+                part = next(built)
+            self.reuseSubdivision(part, this_builder)
+            self.parts[part_key] = part
+        self.addBuilder(this_builder)
+
+    def addSubdivision(self, subdiv: Any, company: Any, builder: Any) -> Tuple:
+        """build a subdivision and its plans, and add them to the dataset"""
+        part = self.buildSubdivision(
+            subdiv, company, builder, self.slugs, self.client.NAME_FILTER_LIST
+        )
+        this_subdiv, plans, subdiv_json, plans_json = part
+        # add PLANS and SUBDIVISION to dataset
+        self.raw["plans"].extend(plans)
+        self.json["plans"].extend(plans_json)
+        self.raw["subdivs"].append(this_subdiv)
+        self.json["subdivs"].append(subdiv_json)
+        return part
+
+    @staticmethod
+    def buildSubdivision(
+        subdiv: Any, company: Any, builder: Any, clientSlugs: Any, filterList: Any
+    ) -> Tuple:
+        """build a subdivision and its plans, returns (subdiv, plans, json, json)"""
+        plans_raw = []
+        plans_json = []
+        # Subdivision data
+        this_subdiv = Subdivision(
+            subdiv,
+            company=company,
+            builder=builder,
+            clientSlugs=clientSlugs,
+            filterList=filterList,
+        )
+        # Data relationships
+        builder.addRelationship(
+            "subdivs", this_subdiv.wp_cpt_id
+        )  # Builder Relationship
+        this_subdiv.addRelationship("builder", builder.wp_cpt_id)  # Subdiv Relationship
+        # Plan xml
+        plans = subdiv.findChildren("Plan", recursive=False)
+        for plan in plans:
+            # Plan data
+            this_plan = Plan(
+                plan,
+                company=company,
+                builder=builder,
+                subdiv=this_subdiv,
+                clientSlugs=clientSlugs,
+                filterList=filterList,
+            )
+            # Data relationships
+            builder.addRelationship(
+                "plans", this_plan.wp_cpt_id
+            )  # Builder-Plan Relationship
+            this_subdiv.addRelationship(
+                "plans", this_plan.wp_cpt_id
+            )  # Subdiv-Plan Relationship
+            this_plan.addRelationship(
+                "builder", builder.wp_cpt_id
+            )  # Plan-Builder Relationship
+            this_plan.addRelationship(
+                "subdiv", this_subdiv.wp_cpt_id
+            )  # Plan-Subdiv Relationship
+            # PLAN data
+            plans_raw.append(this_plan)
+            plans_json.append(this_plan.getDict())
+        return (this_subdiv, plans_raw, this_subdiv.getDict(), plans_json)
+
+    def reuseSubdivision(self, part: Tuple, builder: Any) -> None:
+        """add a previously built subdivision and its plans to the dataset"""
+        this_subdiv, plans, subdiv_json, plans_json = part
+        # Data relationships
+        builder.addRelationship(
+            "subdivs", this_subdiv.wp_cpt_id
+        )  # Builder Relationship
+        for this_plan in plans:
+            builder.addRelationship(
+                "plans", this_plan.wp_cpt_id
+            )  # Builder-Plan Relationship
+        # add PLANS and SUBDIVISION to dataset
+        self.raw["plans"].extend(plans)
+        self.json["plans"].extend(plans_json)
+        self.raw["subdivs"].append(this_subdiv)
+        self.json["subdivs"].append(subdiv_json)
+
+    def addBuilder(self, builder: Any) -> None:
+        """add a builder to the dataset"""
+        self.raw["builders"].append(builder)
+        self.json["builders"].append(builder.getDict())
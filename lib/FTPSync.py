@@ -0,0 +1,118 @@
+import json
+import os
+from ftplib import FTP, all_errors
+from typing import Any, Dict, List
+
+MANIFEST_FILE = "_ftp_manifest.json"
+
+
+# ----------------------------------------------------------------------------------------
+# BDX FTP change-aware sync
+class FTPSync:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<FTPSync %s (%d files tracked)>" % (self.local_dir, len(self.manifest))
+
+    def __init__(
+        self,
+        ftp: FTP,
+        local_dir: str,
+        block_size: int = 1024 * 1024,
+        extensions: List[str] = ["zip"],
+    ) -> None:
+        """constructor"""
+        self.ftp = ftp
+        self.local_dir = local_dir
+        self.block_size = block_size
+        self.extensions = extensions
+        self.manifest_file = os.path.join(local_dir, MANIFEST_FILE)
+        self.manifest: Dict[str, Dict[str, Any]] = self.loadManifest()
+
+    def loadManifest(self) -> Dict[str, Dict[str, Any]]:
+        """remote file state recorded by the last sync"""
+        if os.path.isfile(self.manifest_file):
+            try:
+                with open(self.manifest_file, "r") as manifest:
+                    return json.load(manifest)
+            except ValueError:
+                return {}
+        return {}
+
+    def saveManifest(self) -> None:
+        """write the manifest atomically"""
+        with open(self.manifest_file + ".tmp", "w") as manifest:
+            json.dump(self.manifest, manifest, indent=2, sort_keys=True)
+        os.replace(self.manifest_file + ".tmp", self.manifest_file)
+
+    def remoteState(self, file: str) -> Dict[str, Any]:
+        """remote SIZE and MDTM of a file, None where the server won't say"""
+        state: Dict[str, Any] = {"size": None, "mdtm": None}
+        # unsupported (5xx), busy (4xx) or garbled replies all mean "unknown"
+        try:
+            state["size"] = self.ftp.size(file)
+        except all_errors:
+            pass
+        try:
+            state["mdtm"] = self.ftp.voidcmd("MDTM " + file).split()[-1]
+        except all_errors:
+            pass
+        return state
+
+    def isUnchanged(self, file: str, state: Dict[str, Any]) -> bool:
+        """remote file matches the last completed download"""
+        known = self.manifest.get(file)
+        if known is None or not known.get("complete"):
+            return False
+        # a same-size rewrite can't be told apart without MDTM
+        if state["size"] is None or state["mdtm"] is None:
+            return False
+        return bool(known["size"] == state["size"] and known["mdtm"] == state["mdtm"])
+
+    def sync(self, only_changed: bool = True) -> List[str]:
+        """download new or changed files, returns their local paths"""
+        listing = self.ftp.nlst()
+        # SIZE needs binary mode on most servers (NLST switches to ascii)
+        self.ftp.voidcmd("TYPE I")
+        files = []
+        for file in listing:
+            if file.split(".")[-1].lower() not in self.extensions:
+                continue
+            state = self.remoteState(file)
+            if only_changed and self.isUnchanged(file, state):
+                continue
+            files.append(self.download(file, state))
+        return files
+
+    def download(self, file: str, state: Dict[str, Any]) -> str:
+        """download one file to a .part file, resuming if possible, then rename"""
+        local_file = os.path.join(self.local_dir, file)
+        part_file = local_file + ".part"
+        offset = 0
+        known = self.manifest.get(file, {})
+        # resume only a partial download of this same remote file
+        if (
+            os.path.isfile(part_file)
+            and not known.get("complete", True)
+            and known.get("size") == state["size"]
+            and known.get("mdtm") == state["mdtm"]
+            and state["size"] is not None
+            and state["mdtm"] is not None
+            and os.path.getsize(part_file) <= state["size"]
+        ):
+            offset = os.path.getsize(part_file)
+        self.manifest[file] = {**state, "complete": False}
+        self.saveManifest()
+        if state["size"] is None or offset < state["size"]:
+            with open(
+                part_file, "ab" if offset else "wb", buffering=self.block_size
+            ) as loc_file:
+                self.ftp.retrbinary(
+                    "RETR " + file,
+                    loc_file.write,
+                    self.block_size,
+                    rest=offset or None,
+                )
+        os.replace(part_file, local_file)
+        self.manifest[file] = {**state, "complete": True}
+        self.saveManifest()
+        return local_file
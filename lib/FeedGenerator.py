@@ -0,0 +1,196 @@
+import random
+from typing import Any, Dict, List, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from lib import utilities as UT
+
+
+# ----------------------------------------------------------------------------------------
+# SYNTHETIC BDX feed generator
+class BDXFeedGenerator:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<BDXFeedGenerator %d plans>" % (self.numPlans())
+
+    def __init__(
+        self,
+        corporations: int = 1,
+        builders: int = 2,
+        subdivisions: int = 3,
+        plans: int = 4,
+        images: int = 2,
+        amenities: int = 3,
+        schools: bool = True,
+        seed: int = 1,
+    ) -> None:
+        """constructor"""
+        self.corporations = corporations
+        self.builders = builders
+        self.subdivisions = subdivisions
+        self.plans = plans
+        self.images = images
+        self.amenities = amenities
+        self.schools = schools
+        self.seed = seed
+
+    def numPlans(self) -> int:
+        """plans in one feed"""
+        return self.corporations * self.builders * self.subdivisions * self.plans
+
+    @classmethod
+    def forPlans(cls, plans: int, **options: Any) -> "BDXFeedGenerator":
+        """a generator sized to roughly a number of plans"""
+        per_subdiv = options.pop("plans", 10)
+        subdivs = max(1, plans // per_subdiv)
+        builders = max(1, int(subdivs**0.5) // 2)
+        return cls(
+            corporations=1,
+            builders=builders,
+            subdivisions=max(1, subdivs // builders),
+            plans=per_subdiv,
+            **options,
+        )
+
+    def clientSettings(self, key: str = "BENCH") -> Dict[str, Any]:
+        """client settings (for config.make_client) matching the generated names"""
+        slugs = {}
+        # every builder and subdivision has its own WP ID, like a real site
+        wp_id = 100
+        for c in range(self.corporations):
+            for b in range(self.builders):
+                wp_id += 1
+                slugs[UT.slugify("B%d-%d Brand %d %d" % (c, b, c, b))] = str(wp_id)
+                for s in range(self.subdivisions):
+                    wp_id += 1
+                    slug = "S%d-%d-%d Community %d %d %d" % (c, b, s, c, b, s)
+                    slugs[UT.slugify(slug)] = str(wp_id)
+        return {
+            "CLIENT_NAME": "Synthetic",
+            "BDX_FEED_XML_FILE_ID": key,
+            "NAME_FILTER_LIST": ["The ", " Collection"],
+            "WP_CPT_SLUG_ID": slugs,
+        }
+
+    def write(self, path: str, date: str = "2023-01-01", price_shift: int = 0) -> int:
+        """write a feed to path, returns the number of plans written
+
+        the same seed writes the same feed, a price_shift moves a third of the
+        plan prices up and a third down, like the next day's feed would
+        """
+        rand = random.Random(self.seed)
+        written = 0
+        with open(path, "w", encoding="utf-8") as feed:
+            feed.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            feed.write("<Builders DateGenerated=%s>\n" % quoteattr(date))
+            for c in range(self.corporations):
+                feed.write(
+                    '<Corporation CorporationID="C%d">'
+                    "<CorporateBuilderNumber>CB%d</CorporateBuilderNumber>"
+                    "<CorporateName>%s</CorporateName>\n"
+                    % (c, c, escape("Homes & Co %d" % c))
+                )
+                for b in range(self.builders):
+                    self.writeBuilder(feed, c, b)
+                    for s in range(self.subdivisions):
+                        self.writeSubdivision(feed, c, b, s)
+                        for p in range(self.plans):
+                            written += 1
+                            price = 250000 + rand.randint(0, 750000)
+                            if price_shift and p % 3:
+                                price += price_shift if p % 3 == 1 else -price_shift
+                            self.writePlan(feed, c, b, s, p, price)
+                        feed.write("</Subdivision>\n")
+                    feed.write("</Builder>\n")
+                feed.write("</Corporation>\n")
+            feed.write("</Builders>\n")
+        return written
+
+    def writeBuilder(self, feed: TextIO, c: int, b: int) -> None:
+        """open a Builder element with its own fields"""
+        feed.write(
+            '<Builder BuilderID="B%d-%d"><BuilderNumber>BN%d</BuilderNumber>'
+            "<BrandName>Brand %d %d</BrandName>"
+            "<ReportingName>Brand %d %d</ReportingName>"
+            "<DefaultLeadsEmail>leads%d@example.com</DefaultLeadsEmail>"
+            "<BuilderWebsite>https://brand%d.example.com</BuilderWebsite>"
+            "<BrandLogo_Med>https://img.example.com/logo%d.png</BrandLogo_Med>\n"
+            % (c, b, b, c, b, c, b, b, b, b)
+        )
+
+    def writeSubdivision(self, feed: TextIO, c: int, b: int, s: int) -> None:
+        """open a Subdivision element with its address, office, schools and images"""
+        feed.write(
+            '<Subdivision SubdivisionID="S%d-%d-%d" Status="Active"'
+            ' PriceLow="250000" PriceHigh="1000000" SqftLow="1200" SqftHigh="4000">'
+            "<SubdivisionNumber>%d</SubdivisionNumber>"
+            "<SubdivisionName>The Community %d %d %d Collection</SubdivisionName>"
+            "<MarketingHeadline>Now selling</MarketingHeadline>"
+            "<SubLeadsEmail>sales%d@example.com</SubLeadsEmail>"
+            '<SubAddress OutOfCommunity="0"><SubStreet1>%d Main St</SubStreet1>'
+            "<SubCity>Springfield</SubCity><SubState>CA</SubState>"
+            "<SubZIP>95%03d</SubZIP><SubGeocode><SubLatitude>38.5</SubLatitude>"
+            "<SubLongitude>-121.5</SubLongitude></SubGeocode></SubAddress>"
+            "<SalesOffice><Agent>%s</Agent><Phone><AreaCode>555</AreaCode>"
+            "<Prefix>123</Prefix><Suffix>4567</Suffix></Phone><Address>"
+            "<Street1>1 Office Way</Street1><City>Springfield</City>"
+            "<State>CA</State><ZIP>95000</ZIP><Geocode><Latitude>38.5</Latitude>"
+            "<Longitude>-121.5</Longitude></Geocode></Address>"
+            "<Hours>Mon-Fri 9-5;Sat 10-4</Hours></SalesOffice>\n"
+            % (c, b, s, s, c, b, s, s, s, s % 1000, escape("Ann & Bob"))
+        )
+        if self.schools:
+            feed.write(
+                "<Schools><DistrictName>Unified</DistrictName>"
+                "<Elementary>Oak</Elementary><Middle>Elm</Middle>"
+                "<High>Pine</High></Schools>\n"
+            )
+        feed.write("<SubDescription>A new community.\nClose to parks.</SubDescription>")
+        for i in range(self.images):
+            feed.write(
+                '<SubImage Type="Standard" Title="View %d" SequencePosition="%d">'
+                "https://img.example.com/s%d-%d-%d-%d.jpg</SubImage>"
+                % (i, i + 1, c, b, s, i)
+            )
+        feed.write("\n")
+
+    def writePlan(
+        self, feed: TextIO, c: int, b: int, s: int, p: int, price: int
+    ) -> None:
+        """write one Plan element with its rooms, amenities and images"""
+        plan_id = "P%d-%d-%d-%d" % (c, b, s, p)
+        parts: List[str] = [
+            '<Plan Type="SingleFamily" PlanID="%s"><PlanNumber>%d</PlanNumber>'
+            "<PlanName>The Plan %d Collection</PlanName>"
+            "<BasePrice>%d.00</BasePrice><BaseSqft>%d</BaseSqft>"
+            "<Stories>%d</Stories><Baths>%d</Baths><HalfBaths>%d</HalfBaths>"
+            "<Bedrooms>%d</Bedrooms><Garage>2</Garage><DiningAreas>1</DiningAreas>"
+            "<Basement>0</Basement><PlanNotAvailable>0</PlanNotAvailable>"
+            '<LivingArea Type="Family">1</LivingArea>'
+            % (
+                plan_id,
+                p,
+                p,
+                price,
+                1200 + (p * 150),
+                1 + p % 2,
+                2 + p % 2,
+                p % 2,
+                3 + p % 3,
+            )
+        ]
+        for a in range(self.amenities):
+            parts.append('<PlanAmenity Type="Amenity%d">1</PlanAmenity>' % a)
+        parts.append(
+            "<Description><![CDATA[Plan %d <b>open</b> layout\nwith den]]>"
+            "</Description><PlanImages>" % p
+        )
+        for i in range(self.images):
+            url = "https://img.example.com/%s-%d" % (plan_id, i)
+            parts.append(
+                '<ElevationImage Title="Elevation %d">%s-e.jpg</ElevationImage>'
+                '<FloorPlanImage Title="Floor %d">%s-f.png</FloorPlanImage>'
+                '<InteriorImage Title="Interior %d">%s-i.jpg</InteriorImage>'
+                % (i, url, i, url, i, url)
+            )
+        parts.append("</PlanImages></Plan>\n")
+        feed.write("".join(parts))
@@ -0,0 +1,249 @@
+import http.client
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from lib import constants as C
+
+IMAGE_DIRS = {
+    "floorplans": C.IMG_FLRP,
+    "elevations": C.IMG_ELV,
+    "images": C.IMG_PLN,
+    "interiors": C.IMG_INT,
+}
+
+
+class ImageDownloadError(Exception):
+    pass
+
+
+# ----------------------------------------------------------------------------------------
+# IMAGE download engine
+class ImageDownloader:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<ImageDownloader %d sources (%d workers)>" % (
+            len(self.jobs),
+            self.max_workers,
+        )
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        timeout: float = 30.0,
+        retries: int = 3,
+        block_size: int = 64 * 1024,
+        max_redirects: int = 5,
+    ) -> None:
+        """constructor"""
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.block_size = block_size
+        self.max_redirects = max_redirects
+        # source url -> [(kind, save_to), ...] in the order they were queued
+        self.jobs: Dict[str, List[Tuple[str, str]]] = {}
+        self.report: Dict[str, Dict[str, int]] = {}
+        # "src: Error: message" of every failed download or copy
+        self.errors: List[str] = []
+        # every keep-alive connection of every thread, to close them all
+        self.connections: List[Any] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ImageDownloader":
+        """context manager, connections are closed on exit"""
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        """close every connection"""
+        self.close()
+
+    @staticmethod
+    def imagePath(obj: Any, kind: str, item: Dict[str, Any]) -> str:
+        """local file path for one image of a plan"""
+        file_ext = item["src"].split(".")[-1]
+        filename = f"{obj.wp_slug}-{item['slug']}-{kind}.{file_ext}"
+        if kind in IMAGE_DIRS:
+            return "%s/%s" % (IMAGE_DIRS[kind], filename)
+        return ""
+
+    def add(self, obj: Any, kind: str) -> int:
+        """queue the images of one kind for a record, returns the number queued"""
+        data = None
+        if hasattr(obj, kind):
+            data = getattr(obj, kind)
+        elif hasattr(obj, f"_{kind}"):
+            data = getattr(obj, f"_{kind}")
+        queued = 0
+        for item in data or []:
+            if item.get("slug"):
+                save_to = self.imagePath(obj, kind, item)
+                self.count(kind, "queued")
+                if os.path.isfile(save_to):
+                    self.count(kind, "skipped")
+                    continue
+                destinations = self.jobs.setdefault(item["src"], [])
+                if (kind, save_to) not in destinations:
+                    destinations.append((kind, save_to))
+                    queued += 1
+        return queued
+
+    def count(self, kind: str, key: str, value: int = 1) -> None:
+        """add to the per kind report"""
+        with self._lock:
+            tally = self.report.setdefault(
+                kind,
+                {
+                    "queued": 0,
+                    "skipped": 0,
+                    "downloaded": 0,
+                    "copied": 0,
+                    "failed": 0,
+                    "bytes": 0,
+                },
+            )
+            tally[key] += value
+
+    def fail(self, kind: str, src: str, error: Exception) -> None:
+        """count a failed image, and keep its error"""
+        self.count(kind, "failed")
+        with self._lock:
+            self.errors.append("%s: %s: %s" % (src, type(error).__name__, error))
+
+    def run(self) -> Dict[str, Dict[str, int]]:
+        """download every queued source once, concurrently"""
+        jobs = list(self.jobs.items())
+        self.jobs = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [
+                    (pool.submit(self.fetch, src, destinations), src, destinations)
+                    for src, destinations in jobs
+                ]
+                for future, src, destinations in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        # fetch reports its own errors, this is anything else
+                        for kind, _ in destinations:
+                            self.fail(kind, src, e)
+        finally:
+            self.close()
+        return self.report
+
+    def fetch(self, src: str, destinations: List[Tuple[str, str]]) -> bool:
+        """download one source url, then copy it to its other destinations"""
+        kind, save_to = destinations[0]
+        try:
+            size = self.download(src, save_to)
+        except Exception as e:
+            for kind, _ in destinations:
+                self.fail(kind, src, e)
+            return False
+        self.count(kind, "downloaded")
+        self.count(kind, "bytes", size)
+        # identical source urls are only fetched once
+        copied = True
+        for kind, copy_to in destinations[1:]:
+            tmp_file = "%s.%s.tmp" % (copy_to, threading.get_ident())
+            try:
+                shutil.copyfile(save_to, tmp_file)
+                os.replace(tmp_file, copy_to)
+            except OSError as e:
+                if os.path.isfile(tmp_file):
+                    os.remove(tmp_file)
+                self.fail(kind, src, e)
+                copied = False
+                continue
+            self.count(kind, "copied")
+            self.count(kind, "bytes", size)
+        return copied
+
+    def connection(self, scheme: str, netloc: str) -> Any:
+        """this thread's keep-alive connection to a host"""
+        pool = getattr(self._local, "connections", None)
+        if pool is None:
+            pool = self._local.connections = {}
+        if (scheme, netloc) not in pool:
+            if scheme == "https":
+                conn: Any = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            pool[(scheme, netloc)] = conn
+            with self._lock:
+                self.connections.append(conn)
+        return pool[(scheme, netloc)]
+
+    def close(self) -> None:
+        """close the keep-alive connections of every thread"""
+        with self._lock:
+            connections = self.connections
+            self.connections = []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def dropConnection(self, scheme: str, netloc: str) -> None:
+        """close and forget a broken connection"""
+        pool = getattr(self._local, "connections", {})
+        conn = pool.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+            with self._lock:
+                self.connections.remove(conn)
+
+    def download(self, src: str, save_to: str) -> int:
+        """download src to save_to atomically, returns the bytes written"""
+        url = src
+        # follow redirects one hop at a time, each hop retried on its own
+        for _ in range(self.max_redirects + 1):
+            location, size = self.get(url, save_to)
+            if location is None:
+                return size
+            url = location
+        raise ImageDownloadError(
+            "more than %d redirects for %s" % (self.max_redirects, src)
+        )
+
+    def get(self, src: str, save_to: str) -> Tuple[str | None, int]:
+        """one GET of src with retries, returns (redirect location, bytes written)"""
+        tmp_file = "%s.%s.tmp" % (save_to, threading.get_ident())
+        url = urlsplit(src)
+        path = url.path or "/"
+        if url.query:
+            path = "%s?%s" % (path, url.query)
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self.connection(url.scheme, url.netloc)
+                conn.request("GET", path)
+                response = conn.getresponse()
+                # redirects are followed by download, on a (possibly) new host
+                if response.status in (301, 302, 303, 307, 308):
+                    response.read()
+                    return urljoin(src, response.getheader("Location", "")), 0
+                if response.status != 200:
+                    response.read()
+                    # server errors are retried, anything else is final
+                    if response.status >= 500:
+                        raise IOError("HTTP %d for %s" % (response.status, src))
+                    raise ImageDownloadError("HTTP %d for %s" % (response.status, src))
+                size = 0
+                with open(tmp_file, "wb") as img:
+                    for block in iter(lambda: response.read(self.block_size), b""):
+                        img.write(block)
+                        size += len(block)
+                os.replace(tmp_file, save_to)
+                return None, size
+            except (OSError, http.client.HTTPException):
+                self.dropConnection(url.scheme, url.netloc)
+                if os.path.isfile(tmp_file):
+                    os.remove(tmp_file)
+                if attempt == self.retries:
+                    raise
+                time.sleep(0.5 * (attempt + 1))
+        return None, 0
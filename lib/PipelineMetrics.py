@@ -0,0 +1,97 @@
+import json
+import os
+import resource
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+from lib import constants as C
+
+METRICS_DIR = "_metrics"
+
+
+# ----------------------------------------------------------------------------------------
+# PIPELINE stage timing and memory metrics
+class PipelineMetrics:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<PipelineMetrics client='%s' (%d stages)>" % (
+            self.client_key,
+            len(self.stages),
+        )
+
+    def __init__(self, key: str, trace_memory: bool = False) -> None:
+        """constructor"""
+        self.client_key = key
+        self.trace_memory = trace_memory
+        self.started = datetime.now()
+        self.stages: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """measure wall time, cpu time and memory of one pipeline stage"""
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        metrics: Dict[str, Any] = {"stage": name, "counters": {}}
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield metrics
+        finally:
+            metrics["wall_seconds"] = round(time.perf_counter() - wall, 4)
+            metrics["cpu_seconds"] = round(time.process_time() - cpu, 4)
+            metrics["peak_python_mib"] = None
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                metrics["peak_python_mib"] = round(peak / 1024 / 1024, 2)
+            if tracing:
+                tracemalloc.stop()
+            # ru_maxrss is in KiB on Linux
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            metrics["max_rss_mib"] = round(rss / 1024, 2)
+            self.stages.append(metrics)
+
+    def count(self, key: str, value: int = 1, stage: Any = None) -> None:
+        """add to a stage's counter, and to the run counter named after both"""
+        if stage is not None:
+            stage["counters"][key] = stage["counters"].get(key, 0) + value
+            key = "%s_%s" % (stage["stage"], key)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def data(self) -> Dict[str, Any]:
+        """the run metrics as a dict"""
+        return {
+            "client": self.client_key,
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": round(sum(s["wall_seconds"] for s in self.stages), 4),
+            "cpu_seconds": round(sum(s["cpu_seconds"] for s in self.stages), 4),
+            "stages": self.stages,
+            "counters": self.counters,
+        }
+
+    def save(self, path: str | None = None) -> str:
+        """write the run metrics to a json file, returns its path"""
+        path = path or "%s/%s/%s" % (C.DATA_PATH, self.client_key, METRICS_DIR)
+        if not os.path.exists(path):
+            os.makedirs(path)
+        metrics_file = "%s/metrics-%s.json" % (
+            path,
+            self.started.strftime("%Y-%m-%d-%H%M%S"),
+        )
+        with open(metrics_file + ".tmp", "w") as metrics:
+            json.dump(self.data(), metrics, indent=2)
+        os.replace(metrics_file + ".tmp", metrics_file)
+        return metrics_file
+
+    def summary(self) -> str:
+        """one line of stage times, for the text report"""
+        stages = ", ".join(
+            "%s %.1fs" % (s["stage"], s["wall_seconds"]) for s in self.stages
+        )
+        return "Run: %.1fs (%s)" % (self.data()["wall_seconds"], stages)
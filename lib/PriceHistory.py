@@ -0,0 +1,133 @@
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, List
+
+import pandas as pd
+
+from lib import constants as C
+from lib.DataSoup import BDXDataSoup
+
+HISTORY_FILE = "_price_history.sqlite"
+
+
+# ----------------------------------------------------------------------------------------
+# PLAN price history time series
+class PriceHistory:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<PriceHistory client='%s'>" % (self.client_key)
+
+    def __init__(self, key: str, path: str | None = None) -> None:
+        """constructor"""
+        self.client_key = key
+        self.path = path or "%s/%s" % (C.DATA_PATH, key)
+        self.db = sqlite3.connect(os.path.join(self.path, HISTORY_FILE), timeout=30)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS prices (
+                client TEXT NOT NULL,
+                plan_id TEXT NOT NULL,
+                builder TEXT NOT NULL,
+                subdiv TEXT NOT NULL,
+                date TEXT NOT NULL,
+                name TEXT,
+                builder_name TEXT,
+                subdiv_name TEXT,
+                actual_price INTEGER,
+                base_price INTEGER,
+                base_sqft REAL,
+                PRIMARY KEY (client, plan_id, builder, subdiv, date)
+            )"""
+        )
+        self.db.execute(
+            """CREATE INDEX IF NOT EXISTS prices_by_date
+                ON prices (client, date)"""
+        )
+        self.db.commit()
+
+    def __enter__(self) -> "PriceHistory":
+        """context manager, the history is closed on exit"""
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        """close the history database"""
+        self.close()
+
+    def close(self) -> None:
+        """close the history database"""
+        self.db.close()
+
+    @staticmethod
+    def soupDate(soup: Any) -> str:
+        """YYYY-MM-DD of a soup's feed date"""
+        if isinstance(soup.date, datetime):
+            return soup.date.strftime("%Y-%m-%d")
+        return str(soup.date).replace("/", "-")
+
+    def record(self, soup: Any) -> int:
+        """append (or replace) one row per plan of an ingested feed"""
+        date = self.soupDate(soup)
+        table = soup.planTable()
+        rows = [
+            (
+                self.client_key,
+                str(plan.id),
+                str(plan.builder[0]) if plan.builder else "",
+                str(plan.subdiv[0]) if plan.subdiv else "",
+                date,
+                plan.name,
+                plan.builder_name,
+                plan.subdiv_name,
+                int(plan.actual_price),
+                int(plan.base_price),
+                None if pd.isna(plan.base_sqft) else float(plan.base_sqft),
+            )
+            for plan in table.itertuples(index=False)
+        ]
+        self.db.executemany(
+            "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self.db.commit()
+        return len(rows)
+
+    def dates(self) -> List[str]:
+        """every feed date in the history, oldest first"""
+        rows = self.db.execute(
+            "SELECT DISTINCT date FROM prices WHERE client = ? ORDER BY date",
+            (self.client_key,),
+        )
+        return [date for (date,) in rows]
+
+    def backfill(self, files: List[str], client: Any, cache: Any = None) -> int:
+        """record every archived feed whose date is not in the history yet"""
+        known = set(self.dates())
+        recorded = 0
+        for file in files:
+            date = os.path.basename(file).split(".")[0].split("-")[1:]
+            if "-".join(date) in known:
+                continue
+            soup = BDXDataSoup(file, client, stream=True, cache=cache)
+            recorded += self.record(soup)
+            known.add(self.soupDate(soup))
+        return recorded
+
+    def history(
+        self, plan_id: str, start: str | None = None, end: str | None = None
+    ) -> pd.DataFrame:
+        """one plan's prices by date, optionally between two YYYY-MM-DD dates"""
+        return pd.read_sql_query(
+            "SELECT * FROM prices WHERE client = ? AND plan_id = ?"
+            " AND date >= ? AND date <= ? ORDER BY date, builder, subdiv",
+            self.db,
+            params=(self.client_key, str(plan_id), start or "", end or "9999"),
+        )
+
+    def between(self, start: str, end: str) -> pd.DataFrame:
+        """every plan's prices between two YYYY-MM-DD dates"""
+        return pd.read_sql_query(
+            "SELECT * FROM prices WHERE client = ? AND date >= ? AND date <= ?"
+            " ORDER BY date, plan_id, builder, subdiv",
+            self.db,
+            params=(self.client_key, start, end),
+        )
@@ -5,14 +5,68 @@ import os
 import shutil
 from datetime import datetime
 from ftplib import FTP
-from typing import Any, Dict, List
-from urllib.request import urlretrieve
+from itertools import groupby
+from typing import Any, Dict, Iterator, List
 from zipfile import ZipFile
 
-import paramiko
+import numpy as np
+import pandas as pd
 
 from lib import constants as C
-from lib.DataSoup import BDXDataSoup
+from lib.DataSoup import BDXDataSoup, typeColumns
+from lib.FTPSync import FTPSync
+from lib.ImageDownloader import ImageDownloader
+from lib.PipelineMetrics import PipelineMetrics
+from lib.PriceHistory import PriceHistory
+from lib.SFTPUploader import SFTPUploader
+from lib.SnapshotIndex import SnapshotIndex
+from lib.SoupCache import SoupCache
+
+
+# text columns of a columnar file are one utf-8 blob and the character offsets
+# of its values, so a long value doesn't widen every row of a fixed width array
+TEXT_BLOB = "%s.utf8"
+TEXT_OFFSETS = "%s.offsets"
+# nullable integer columns are their values and a missing value mask
+NULL_MASK = "%s.na"
+COLUMN_ORDER = "__columns__"
+
+
+def packColumns(table: pd.DataFrame) -> Dict[str, Any]:
+    # one array per column (no pickled objects), text as a blob and offsets
+    columns: Dict[str, Any] = {}
+    for field in map(str, table.columns):
+        if pd.api.types.is_string_dtype(table[field]):
+            values = table[field].astype(str).tolist()
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in values], out=offsets[1:])
+            blob = "".join(values).encode("utf-8")
+            columns[TEXT_BLOB % field] = np.frombuffer(blob, dtype=np.uint8)
+            columns[TEXT_OFFSETS % field] = offsets
+        elif isinstance(table[field].dtype, pd.Int64Dtype):
+            columns[field] = table[field].to_numpy(dtype=np.int64, na_value=0)
+            columns[NULL_MASK % field] = table[field].isna().to_numpy()
+        else:
+            columns[field] = table[field].to_numpy()
+    columns[COLUMN_ORDER] = np.array(list(map(str, table.columns)), dtype=np.str_)
+    return columns
+
+
+def unpackColumns(columns: Any) -> pd.DataFrame:
+    # the table packed by packColumns, text decoded once per column
+    data: Dict[str, Any] = {}
+    for field in columns[COLUMN_ORDER].tolist():
+        if TEXT_BLOB % field in columns.files:
+            text = columns[TEXT_BLOB % field].tobytes().decode("utf-8")
+            offsets = columns[TEXT_OFFSETS % field].tolist()
+            data[field] = [text[a:b] for a, b in zip(offsets, offsets[1:])]
+        elif NULL_MASK % field in columns.files:
+            data[field] = pd.arrays.IntegerArray(
+                columns[field], columns[NULL_MASK % field]
+            )
+        else:
+            data[field] = columns[field]
+    return pd.DataFrame(data)
 
 
 class DataFile:
@@ -23,30 +77,34 @@ class DataFile:
         self.name = filebase[0]
         self.ext = filebase[-1]
         self.client_id = fileparts[0]
-        self.type = fileparts[1]
+        # KEY-plans-YYYY-MM-DD.csv, or a KEY-YYYY-MM-DD.xml (or .zip) feed snapshot
+        self.type = fileparts[1] if len(fileparts) != 4 else self.ext
         self.src = f"{C.DATA_PATH}/{fileparts[0]}"
         self.date = self.stamp_date(fileparts)
 
     def __repr__(self) -> str:
         return f"<DataFile name='{self.client_id} {self.type.capitalize()}'>"
 
-    def dataframe(self) -> Dict[int, Any]:
-        # create a dictionary
-        data = {}
+    def rows(self) -> Iterator[Dict[str, str]]:
+        # read the csv file lazily, one row dict at a time
         if os.path.exists(f"{self.src}/{self.file}"):
-            # df = pd.read_csv( f'{self.src}/{self.file}' )
-            # return df
-            # Open a csv reader called DictReader
-            with open(f"{self.src}/{self.file}", encoding="utf-8") as csvf:
-                csvReader = csv.DictReader(csvf)
-                # Convert each row into a dictionary
-                # and add it to data
-                count = 0
-                for rows in csvReader:
-                    data[count] = rows
-                    count += 1
-        # return the data
-        return data
+            with open(f"{self.src}/{self.file}", encoding="utf-8", newline="") as csvf:
+                yield from csv.DictReader(csvf)
+
+    def dataframe(self) -> Dict[int, Any]:
+        # every row of the csv file, keyed by its row number
+        return dict(enumerate(self.rows()))
+
+    def table(self) -> pd.DataFrame:
+        # typed columns of a columnar (npz) data file, or of a csv file
+        if not os.path.exists(f"{self.src}/{self.file}"):
+            return pd.DataFrame()
+        if self.ext == "npz":
+            with np.load(f"{self.src}/{self.file}") as columns:
+                return unpackColumns(columns)
+        # read the text, then apply the explicit dtypes of this data type
+        table = pd.read_csv(f"{self.src}/{self.file}", dtype=str, keep_default_na=False)
+        return typeColumns(table, self.type)
 
     @staticmethod
     def stamp_date(str_parts: Any) -> str:
@@ -58,19 +116,31 @@ class DataFile:
 
 
 class DataFileHandler:
-    data: List[Any] = []
-    groups: List[Any] = []
-
-    def __init__(self, key: Any, filetype: str = "") -> None:
+    def __init__(
+        self, key: Any, filetype: str | List[str] = "", index: Any = None
+    ) -> None:
+        self.data: List[Any] = []
+        self.groups: List[Any] = []
         self.client_key = key
         self.filetype = filetype
-        for file in os.listdir(f"{C.DATA_PATH}/{key}"):
-            if file[0] not in ["_", "."] and file.split(".")[-1] == filetype:
-                self.add(file)
+        self.filetypes = [filetype] if isinstance(filetype, str) else filetype
+        # indexed snapshot files, newest first, from a run's (refreshed) index
+        if index is not None:
+            self.load(index)
+        else:
+            # or from our own, only new or changed files are hashed
+            with SnapshotIndex(key) as index:
+                index.refresh()
+                self.load(index)
+        self.sort()
 
     def __repr__(self) -> str:
         return f"<DataFileHandler client='{self.client_key}' n='{len(self.data)}'>"
 
+    def load(self, index: SnapshotIndex) -> None:
+        for file in index.files(self.filetypes):
+            self.add(file)
+
     def add(self, file: str) -> None:
         is_current = file.split(".")[0].split("-")[-1] == "current"
         is_source = file.split(".")[0].split("-")[-1] == self.client_key
@@ -79,46 +149,31 @@ class DataFileHandler:
             self.data.append(dfile)
 
     def sort(self) -> None:
-        # sort data set by the data file data attr
-        self.data: List[Any] = sorted(
-            self.data,
-            key=lambda k: datetime.strptime(k.date, "%Y-%m-%d"),
-            reverse=True,
-        )
+        # sort data set by the data file date (YYYY-MM-DD sorts as text)
+        self.data = sorted(self.data, key=lambda k: k.date, reverse=True)
         # break files into groups by date
-        group: List[Any] = []
-        last_date = None
-        date_changed = False
-        for item in self.data:
-            if isinstance(last_date, str):
-                date_changed = (not last_date == item.date) if True else False
-            last_date = item.date
-            if date_changed:
-                self.groups.append(group)
-                group.clear()
-            group.append(item)
+        self.groups = [
+            list(group) for _, group in groupby(self.data, key=lambda k: k.date)
+        ]
+
+    def group(self, n: int = 0) -> Dict[str, Any] | None:
+        # data files of the nth newest date, keyed by their data type
+        if n >= len(self.groups):
+            return None
+        return {dfile.type: dfile for dfile in self.groups[n]}
 
     def latest(self) -> Dict[str, Any] | None:
-        try:
-            latest_file = self.groups[0]
-            latest_data = dict()
-            # loop each index and
-            for index in range(0, len(latest_file)):
-                latest_data[latest_file[index].type] = latest_file[index]
-            return latest_data
-        except Exception:
+        return self.group(0)
+
+    def tables(self, n: int = 0) -> Dict[str, pd.DataFrame] | None:
+        # load every data file of the nth newest group, by data type
+        group = self.latest() if n == 0 else self.previous(n)
+        if group is None:
             return None
+        return {data_type: datafile.table() for data_type, datafile in group.items()}
 
     def previous(self, n: int = 1) -> Dict[str, Any] | None:
-        try:
-            previous_file = self.groups[n]
-            previous_data = dict()
-            # loop each index and set previous data dict
-            for index in range(0, len(previous_file)):
-                previous_data[previous_file[index].type] = previous_file[index]
-            return previous_data
-        except Exception:
-            return None
+        return self.group(n)
 
 
 # --------------------------------------------------------------------------------------
@@ -127,6 +182,10 @@ class PyBDX:
     data_files: List[Any] = []
     xml_files: Any = None
     csv_files: Any = None
+    npz_files: Any = None
+    upload_report: Dict[str, Any] | None = None
+    snapshot_index: SnapshotIndex | None = None
+    metrics_file: str | None = None
     data: Any = None
 
     def __repr__(self) -> str:
@@ -139,35 +198,149 @@ class PyBDX:
         analyze: bool = False,
         convert: bool = False,
         upload: bool = False,
+        archive: bool = False,
+        full_ingest: bool = False,
+        trace_memory: bool = False,
+        ingest_workers: int = 0,
     ) -> None:
         self.client = client
+        self.archive = archive
         self.key = client.BDX_FEED_XML_FILE_ID
         self.client_data_path = "%s/%s" % (C.DATA_PATH, client.BDX_FEED_XML_FILE_ID)
         self.checkDataDirectories()
         self.formatFileNames()
-        # download new datafiles
-        if download:
-            zip_download = self.downloadDataFromBDX()
-            self.data_files = self.decompressDataFiles(zip_download)
-            self.key = self.data_files[0].split(".")[:-1][0]
-        # copy latest file to a current copy to manipulate
-        resource = self.makeCurrentDataFiles()
-        # data wrangling (the magic ✨)
-        if analyze:
-            preload_data = BDXDataSoup(resource, client)
-            # exit()
-            # if converting data to update CSV import files
-            if convert:
-                # iterate each json list to convert to csv
-                for data_key in preload_data.json:
-                    self.saveDataToAllImportCSV(
-                        data_key=data_key,
-                        json_data=preload_data.json[data_key],
-                        upload=upload,
+        # per stage timing, memory and counters of this run
+        self.metrics = PipelineMetrics(self.key, trace_memory)
+        # one snapshot index for the run, refreshed once, then kept current as
+        # the pipeline writes files
+        index = SnapshotIndex(self.key)
+        self.snapshot_index = index
+        try:
+            index.refresh()
+            # download new datafiles
+            if download:
+                with self.metrics.stage("download") as stage:
+                    zip_download = self.downloadDataFromBDX()
+                    self.metrics.count("files", len(zip_download), stage)
+                    self.metrics.count("bytes", self.fileSizes(zip_download), stage)
+                # unchanged feeds are not downloaded again
+                if len(zip_download) > 0 and archive:
+                    # keep the zip as today's snapshot, without extracting it
+                    with self.metrics.stage("archive") as stage:
+                        self.data_files = self.archiveDataFiles(zip_download)
+                        self.metrics.count("files", len(self.data_files), stage)
+                elif len(zip_download) > 0:
+                    with self.metrics.stage("decompress") as stage:
+                        self.data_files = self.decompressDataFiles(zip_download)
+                        self.metrics.count("files", len(self.data_files), stage)
+                    self.key = self.data_files[0].split(".")[:-1][0]
+            with self.metrics.stage("current") as stage:
+                if archive:
+                    # read today's zipped snapshot directly
+                    resource = self.makeCurrentArchive()
+                else:
+                    # copy latest file to a current copy to manipulate
+                    resource = self.makeCurrentDataFiles()
+                self.metrics.count("bytes", self.fileSizes([resource]), stage)
+            # data wrangling (the magic ✨)
+            if analyze:
+                with self.metrics.stage("ingest") as stage:
+                    cache = SoupCache()
+                    previous = None
+                    if full_ingest:
+                        # rebuild today's snapshot from scratch, then recache it
+                        cache.invalidate(resource, client)
+                    elif not cache.contains(resource, client):
+                        # reuse unchanged subtrees from the previous snapshot
+                        previous = self.previousSoup(cache)
+                    preload_data = BDXDataSoup(
+                        resource,
+                        client,
+                        stream=True,
+                        cache=cache,
+                        previous=previous,
+                        full=full_ingest,
+                        workers=ingest_workers,
+                    )
+                    self.metrics.count("workers", ingest_workers, stage)
+                    for data_key in preload_data.raw:
+                        records = len(preload_data.raw[data_key])
+                        self.metrics.count("records", records, stage)
+                        self.metrics.count(data_key, records, stage)
+                    self.metrics.count("images", self.countImages(preload_data), stage)
+                with self.metrics.stage("history") as stage:
+                    # append today's plan prices to the price history
+                    with self.priceHistory() as history:
+                        rows = history.record(preload_data)
+                    self.metrics.count("records", rows, stage)
+                # exit()
+                # if converting data to update CSV import files
+                if convert:
+                    # one pooled sftp connection uploads every csv file
+                    uploader = (
+                        SFTPUploader(client, self.client_data_path) if upload else None
                     )
-        # compiling csv data
-        self.csv_files = self.getClientDataCSV()
-        self.xml_files = self.getClientDataXML()
+                    with self.metrics.stage("convert") as stage:
+                        # iterate each json list to convert to csv
+                        for data_key in preload_data.json:
+                            self.saveDataToAllImportCSV(
+                                data_key=data_key,
+                                json_data=preload_data.json[data_key],
+                                upload=upload,
+                                fields=preload_data.fields(data_key),
+                                uploader=uploader,
+                            )
+                            # typed columnar copy, for fast bulk loads
+                            self.saveDataToColumnar(
+                                data_key=data_key,
+                                table=preload_data.table(data_key),
+                            )
+                        # today's csv and npz file of every data key
+                        converted = [
+                            "%s/%s-%s-%s.%s"
+                            % (self.client_data_path, self.key, key, self.todaystr, ext)
+                            for key in preload_data.json
+                            for ext in ["csv", "npz"]
+                        ]
+                        self.metrics.count("files", len(converted), stage)
+                        self.metrics.count("bytes", self.fileSizes(converted), stage)
+                    if uploader is not None:
+                        with self.metrics.stage("upload") as stage:
+                            self.upload_report = uploader.run()
+                            for counter in ["uploaded", "skipped", "failed", "bytes"]:
+                                self.metrics.count(
+                                    counter, self.upload_report[counter], stage
+                                )
+            # compiling csv data
+            with self.metrics.stage("index") as stage:
+                self.csv_files = self.getClientDataCSV()
+                self.npz_files = self.getClientDataNPZ()
+                self.xml_files = self.getClientDataXML()
+                for handler in [self.csv_files, self.npz_files, self.xml_files]:
+                    self.metrics.count("files", len(handler.data), stage)
+            self.metrics_file = self.metrics.save()
+        finally:
+            index.close()
+            self.snapshot_index = None
+        # a failed upload fails the run, once its metrics are saved
+        if self.upload_report is not None:
+            SFTPUploader.raiseFailed(self.upload_report)
+
+    @staticmethod
+    def fileSizes(files: List[str]) -> int:
+        # total size in bytes of the files that exist
+        return sum(os.path.getsize(file) for file in files if os.path.isfile(file))
+
+    @staticmethod
+    def countImages(soup: BDXDataSoup) -> int:
+        # image urls referenced by the plans of a soup; _images holds every
+        # kind, and a [{}] placeholder where a kind has no images
+        return sum(
+            1
+            for plan in soup.raw["plans"]
+            for image in getattr(plan, "_images", None) or []
+            if isinstance(image, dict) and image.get("src")
+        )
 
     @staticmethod
     def print(obj: object, keys: list) -> None:
@@ -175,47 +348,146 @@ class PyBDX:
         print("\n".join(display))
 
     @staticmethod
-    def ReheatSoup(resource: Any, client: Any) -> BDXDataSoup | None:
+    def ReheatSoup(
+        resource: Any, client: Any, stream: bool = True, cache: bool = True
+    ) -> BDXDataSoup | None:
         warm_soup = None
         # if a data file exists
         if os.path.isfile(resource):
-            warm_soup = BDXDataSoup(resource, client)
+            warm_soup = BDXDataSoup(
+                resource,
+                client,
+                stream=stream,
+                cache=SoupCache() if cache else None,
+            )
         return warm_soup
 
-    def loadDataFromCsv(self, key: str = "plans", datafile: Any = None) -> List | None:
-        # get pandas dataframe
+    def loadDataFromCsv(
+        self, key: str = "plans", datafile: Any = None, stream: bool = False
+    ) -> Iterator[Dict[str, str]] | List | None:
+        # the rows of a data file, as a lazy generator or a list
         if datafile is not None:
-            key_data = datafile[key].dataframe()
-            all_items = []
-            for row in key_data:
-                raw_data = {}
-                for node in key_data[row].keys():
-                    raw_data[node] = key_data[row][node]
-                all_items.append(raw_data)
-            return all_items
+            if stream:
+                return datafile[key].rows()
+            return list(datafile[key].rows())
+        return None
+
+    def loadDataFrame(
+        self, key: str = "plans", datafile: Any = None
+    ) -> pd.DataFrame | None:
+        # typed columns of a data file, in one bulk read
+        if datafile is not None and key in datafile:
+            return datafile[key].table()
+        return None
+
+    def pricingReport(self, output: List | None = None) -> List:
+        # report the current plan prices and changes since the previous feed
+        if output is None:
+            output = []
+        # Load current data
+        cur_file = f"{self.xml_files.data[0].src}/{self.xml_files.data[0].file}"
+        curr_soup: BDXDataSoup | None = self.ReheatSoup(cur_file, self.client)
+        if not isinstance(curr_soup, BDXDataSoup):
+            raise Exception("BDXDataSoup not found")
+
+        # append data source info
+        cur_data_source = "Current: %d plans found in %s" % (
+            len(curr_soup.raw["plans"]),
+            cur_file,
+        )
+        output.append(cur_data_source)
+
+        # Load previous data if applicable
+        prev_soup: BDXDataSoup | None = None
+        if len(self.xml_files.data) > 1:
+            prev_file = f"{self.xml_files.data[0].src}/{self.xml_files.data[1].file}"
+            prev_soup = self.ReheatSoup(prev_file, self.client)
+            if not isinstance(prev_soup, BDXDataSoup):
+                raise Exception("Previous BDXDataSoup not found")
+            prev_data_source = "Previous: %d plans found in %s" % (
+                len(prev_soup.raw["plans"]),
+                prev_file,
+            )
+            output.append(prev_data_source)
+
+        # calculate observed pricing changes for every plan in one pass
+        pricing = self.calcPricingChanges(prev_soup, curr_soup)
+        output.append(
+            "Prices: %d increased, %d decreased, %d unchanged, %d new"
+            % (
+                pricing["increased"],
+                pricing["decreased"],
+                pricing["unchanged"],
+                pricing["new"],
+            )
+        )
+
+        output.append(16 * "----")
+
+        # loop current plans
+        for cur_plan in pricing["table"].itertuples(index=False):
+            # print current plan info
+            if cur_plan.builder_name is not None:
+                output.append(cur_plan.builder_name)
+            if cur_plan.subdiv_name is not None:
+                output.append(cur_plan.subdiv_name)
+            output.append(cur_plan.name)
+            output.append(cur_plan.plan_price)
+            output.append("")
+        return output
+
+    def previousSoup(self, cache: SoupCache) -> BDXDataSoup | None:
+        # the latest data file from before today, only if its soup is cached:
+        # parsing it would cost more than the reuse saves
+        xml_archive = self.getClientDataXML()
+        for datafile in xml_archive.data:
+            if datafile.date < self.todaystr:
+                resource = f"{datafile.src}/{datafile.file}"
+                if cache.contains(resource, self.client):
+                    return BDXDataSoup(resource, self.client, stream=True, cache=cache)
+                return None
         return None
 
+    def priceHistory(self) -> PriceHistory:
+        return PriceHistory(self.key)
+
+    def backfillPriceHistory(self) -> int:
+        # record every archived feed missing from the price history, oldest first
+        xml_archive = self.getClientDataXML()
+        files = [f"{datafile.src}/{datafile.file}" for datafile in xml_archive.data]
+        # each feed is backfilled once ever, so its soup is not cached: caching
+        # a year of feeds would evict the recent snapshots the next run reads
+        with self.priceHistory() as history:
+            return history.backfill(files[::-1], self.client)
+
     def getClientDataXML(self) -> DataFileHandler:
-        xml_archive = DataFileHandler(self.key, "xml")
-        xml_archive.sort()
-        return xml_archive
+        # zipped snapshots are read like xml files
+        filetype: str | List[str] = ["zip", "xml"] if self.archive else "xml"
+        return DataFileHandler(self.key, filetype, self.snapshot_index)
 
     def getClientDataCSV(self) -> DataFileHandler:
-        csv_archive = DataFileHandler(self.key, "csv")
-        csv_archive.sort()
-        return csv_archive
+        return DataFileHandler(self.key, "csv", self.snapshot_index)
+
+    def getClientDataNPZ(self) -> DataFileHandler:
+        return DataFileHandler(self.key, "npz", self.snapshot_index)
 
     @staticmethod
-    def findMatchingCPT(needle: Any, haystack: List = []) -> Any:
+    def findMatchingCPT(needle: Any, haystack: List | Dict = []) -> Any:
         if isinstance(needle, list) and len(needle) > 0:
             needle = needle[0]
+        # BDXDataSoup.index lookup by WP ID
+        if isinstance(haystack, dict):
+            return haystack.get(needle)
         for check in haystack:
             if needle == check.wp_cpt_id:
                 return check
         return None
 
     @staticmethod
-    def findMatchingPlan(needle: Any, haystack: List = []) -> Any:
+    def findMatchingPlan(needle: Any, haystack: List | Dict = []) -> Any:
+        # BDXDataSoup.index lookup by plan key
+        if isinstance(haystack, dict):
+            return haystack.get(BDXDataSoup.planKey(needle))
         for check in haystack:
             if (
                 needle.name == check.name
@@ -246,6 +518,50 @@ class PyBDX:
             plan_price = f"$ { current.actual_price } ({ current.base_price })"
         return plan_price
 
+    @staticmethod
+    def calcPricingChanges(previous: Any, current: Any) -> Dict[str, Any]:
+        # join current and previous plan tables on the plan key, and compute
+        # every price change, percent change and report string in one pass
+        keys = ["name", "builder", "subdiv"]
+        table = current.planTable()
+        if previous is not None:
+            prev_table = (
+                previous.planTable()
+                .drop_duplicates(keys)[keys + ["actual_price"]]
+                .rename(columns={"actual_price": "previous_price"})
+            )
+            table = table.merge(prev_table, how="left", on=keys, sort=False)
+        else:
+            table["previous_price"] = np.nan
+        table["price_diff"] = table["actual_price"] - table["previous_price"]
+        table["price_pct"] = table["price_diff"] / table["previous_price"] * 100
+        # format plan prices like calcPlanPricing
+        changed = table["price_diff"].fillna(0) != 0
+        plan_diff = table["price_diff"].fillna(0).astype("int64").astype(str)
+        plan_diff = np.where(table["price_diff"] > 0, "+", "") + plan_diff
+        plan_price = (
+            "$ "
+            + table["actual_price"].astype(str)
+            + " ("
+            + table["base_price"].astype(str)
+            + ")"
+        )
+        table["plan_price"] = plan_price.where(
+            ~changed, plan_price + " —> Δ " + plan_diff
+        )
+        return {
+            "table": table,
+            "increased": int((table["price_diff"] > 0).sum()),
+            "decreased": int((table["price_diff"] < 0).sum()),
+            "unchanged": int((table["price_diff"] == 0).sum()),
+            "new": int(table["previous_price"].isna().sum()),
+        }
+
+    def indexFile(self, file_name: str) -> None:
+        # keep this run's snapshot index current as the pipeline writes files
+        if self.snapshot_index is not None:
+            self.snapshot_index.add(file_name)
+
     def checkDataDirectories(self) -> bool:
         if not os.path.exists(self.client_data_path):
             os.makedirs(self.client_data_path)
@@ -261,26 +577,18 @@ class PyBDX:
         self.todaystr = "{}-{}-{}".format(year, month, day)
         self.xml_file_today = "%s-%s.xml" % (self.key, self.todaystr)
         self.xml_file_current = "%s-%s.xml" % (self.key, "current")
+        self.zip_file_today = "%s-%s.zip" % (self.key, self.todaystr)
 
-    def downloadDataFromBDX(self) -> List:
-        # connect to host, and download ZIP data files
+    def downloadDataFromBDX(self, sync: bool = True) -> List:
+        # connect to host, and download new or changed ZIP data files
         ftp = FTP(self.client.BDX_SERVERHOST)
         ftp.login(user=self.client.BDX_USERNAME, passwd=self.client.BDX_PASSWORD)
-        files = []
-        download_path = ""
-        # loop files in BDX FTP source
-        for file in ftp.nlst():
-            download_path = self.client.BDX_SERVER_PATH + ftp.pwd()
-            # only grab the zip file
-            if "zip" == file.split(".")[-1].lower():
-                download_path = "%s/%s" % (download_path, file)
-            # download the file
-            download_zip = os.path.join(C.DATA_PATH, self.key, file)
-            loc_file = open(download_zip, "wb")
-            ftp.retrbinary("RETR " + file, loc_file.write, 8 * 1024)
-            loc_file.close()
-            # track the files downloaded
-            files.append(download_zip)
+        try:
+            files = FTPSync(ftp, os.path.join(C.DATA_PATH, self.key)).sync(
+                only_changed=sync
+            )
+        finally:
+            ftp.quit()
         # return the list of files downloaded
         return files
 
@@ -294,11 +602,47 @@ class PyBDX:
             # extracting all the files
             zipf.extractall("%s/%s" % (C.DATA_PATH, self.key))
             xmlfiles = zipf.namelist()
+            for xmlfile in xmlfiles:
+                self.indexFile(xmlfile)
             # delete the zip file
             os.remove(file)
         # return the list of xml files
         return xmlfiles
 
+    def archiveDataFiles(self, zip_files: List) -> List:
+        # keep each downloaded zip file as today's dated snapshot
+        archived = []
+        for file in zip_files:
+            with ZipFile(file, "r") as zipf:
+                BDXDataSoup.zipMember(zipf)
+            os.replace(file, "%s/%s/%s" % (C.DATA_PATH, self.key, self.zip_file_today))
+            self.indexFile(self.zip_file_today)
+            archived.append(self.zip_file_today)
+        return archived
+
+    def makeCurrentArchive(self) -> str:
+        zip_today = "%s/%s/%s" % (C.DATA_PATH, self.key, self.zip_file_today)
+        if os.path.isfile(zip_today):
+            return zip_today
+        # unchanged feed, link the latest snapshot as today's
+        snapshots = DataFileHandler(self.key, "zip", self.snapshot_index)
+        if len(snapshots.data) > 0:
+            latest = "%s/%s" % (snapshots.data[0].src, snapshots.data[0].file)
+            try:
+                os.link(latest, zip_today)
+            except OSError:
+                shutil.copy(latest, zip_today)
+            self.indexFile(self.zip_file_today)
+            return zip_today
+        # no zip snapshot yet (archiving was just turned on), read the latest xml
+        snapshots = DataFileHandler(self.key, "xml", self.snapshot_index)
+        if len(snapshots.data) > 0:
+            return "%s/%s" % (snapshots.data[0].src, snapshots.data[0].file)
+        raise FileNotFoundError(
+            "no zip or xml snapshot of %s in %s, download the feed first"
+            % (self.key, self.client_data_path)
+        )
+
     def makeCurrentDataFiles(self) -> str:
         # src file exists but today's
         if os.path.isfile(
@@ -311,6 +655,7 @@ class PyBDX:
                 "%s/%s/%s.xml" % (C.DATA_PATH, self.key, self.key),
                 "%s/%s/%s" % (C.DATA_PATH, self.key, self.xml_file_today),
             )
+            self.indexFile(self.xml_file_today)
         # today's data exists
         if os.path.isfile("%s/%s/%s" % (C.DATA_PATH, self.key, self.xml_file_today)):
             # copy today's data file and rename it with the "current" tag
@@ -322,82 +667,123 @@ class PyBDX:
         return "%s/%s/%s" % (C.DATA_PATH, self.key, self.xml_file_current)
 
     def saveDataToAllImportCSV(
-        self, data_key: str, json_data: Any, upload: bool
+        self,
+        data_key: str,
+        json_data: Any,
+        upload: bool,
+        fields: List[str] | None = None,
+        uploader: Any = None,
     ) -> bool:
         csv_file_today = "%s-%s-%s.csv" % (self.key, data_key, self.todaystr)
         csv_file_current = "%s-%s-current.csv" % (self.key, data_key)
-        # save Today's json data to a csv file
-        self._saveJSONtoCSV(data=json_data, file_name=csv_file_today)
-        # save Current the json data to a csv file
-        self._saveJSONtoCSV(data=json_data, file_name=csv_file_current)
+        # save Today's json data to a csv file, serialized once
+        self._saveJSONtoCSV(data=json_data, file_name=csv_file_today, fields=fields)
+        # link (or copy) Today's csv file as the Current csv file
+        self._linkDataFile(csv_file_today, csv_file_current)
         # if requested to upload this data file to the server
         if upload and os.path.isfile(
             "%s/%s/%s" % (C.DATA_PATH, self.key, csv_file_current)
         ):
             # upload the csv file to the remote server for web use
-            if self._uploadFileToServer(csv_file_today):
+            if self._uploadFileToServer(csv_file_today, uploader):
                 return True
         return False
 
-    def _saveJSONtoCSV(self, data: Any, file_name: str) -> bool:
-        # open the file to save data in
-        data_file = open("%s/%s/%s" % (C.DATA_PATH, self.key, file_name), "w")
-        # create the csv writer object
-        csv_writer = csv.writer(data_file)
-        # counter variable used for writing headers
-        count = 0
-        for row in data:
-            if count == 0:
-                # write CSV file headers
-                header = row.keys()
-                csv_writer.writerow(header)
-                count += 1
-            # write CSV file data
-            csv_writer.writerow(row.values())
-        data_file.close()
+    def _saveJSONtoCSV(
+        self,
+        data: Any,
+        file_name: str,
+        fields: List[str] | None = None,
+        block_size: int = 1024 * 1024,
+    ) -> bool:
+        file_path = "%s/%s/%s" % (C.DATA_PATH, self.key, file_name)
+        self.writeCSV(file_path, data, fields, block_size)
+        self.indexFile(file_name)
+        return True
+
+    @staticmethod
+    def writeCSV(
+        file_path: str,
+        data: Any,
+        fields: List[str] | None = None,
+        block_size: int = 1024 * 1024,
+    ) -> None:
+        # without a record schema, use every key in the order first seen
+        if fields is None:
+            data = list(data)
+            fields = list(dict.fromkeys(key for row in data for key in row))
+        # write to a temp file, then replace the data file in one step
+        with open(
+            file_path + ".tmp",
+            "w",
+            encoding="utf-8",
+            newline="",
+            buffering=block_size,
+        ) as data_file:
+            # empty fields are left blank, so every row lines up with the header
+            csv_writer = csv.DictWriter(data_file, fieldnames=fields, restval="")
+            csv_writer.writeheader()
+            csv_writer.writerows(data)
+        os.replace(file_path + ".tmp", file_path)
+
+    def saveDataToColumnar(self, data_key: str, table: pd.DataFrame) -> bool:
+        npz_file_today = "%s-%s-%s.npz" % (self.key, data_key, self.todaystr)
+        npz_file_current = "%s-%s-current.npz" % (self.key, data_key)
+        file_path = "%s/%s/%s" % (C.DATA_PATH, self.key, npz_file_today)
+        with open(file_path + ".tmp", "wb") as data_file:
+            np.savez_compressed(data_file, **packColumns(table))
+        os.replace(file_path + ".tmp", file_path)
+        self.indexFile(npz_file_today)
+        # link (or copy) Today's npz file as the Current npz file
+        self._linkDataFile(npz_file_today, npz_file_current)
+        return True
+
+    def _linkDataFile(self, file_name: str, link_name: str) -> bool:
+        file_src = "%s/%s/%s" % (C.DATA_PATH, self.key, file_name)
+        file_dst = "%s/%s/%s" % (C.DATA_PATH, self.key, link_name)
+        # a temp file left behind by an interrupted run
+        if os.path.lexists(file_dst + ".tmp"):
+            os.remove(file_dst + ".tmp")
+        # hardlink where the filesystem allows it, then replace in one step
+        try:
+            os.link(file_src, file_dst + ".tmp")
+        except OSError:
+            shutil.copyfile(file_src, file_dst + ".tmp")
+        os.replace(file_dst + ".tmp", file_dst)
         return True
 
-    def _uploadFileToServer(self, file_name: str) -> bool:
+    def _uploadFileToServer(self, file_name: str, uploader: Any = None) -> bool:
         # uploading data files to the RI data folder
         file_src = "%s/%s/%s" % (C.DATA_PATH, self.key, file_name)
         file_dst = "%s/%s" % (self.client.SITE_DUMP_PATH, file_name)
-        ssh = paramiko.SSHClient()
-        ssh.load_host_keys(os.path.expanduser(os.path.join("~", ".ssh", "known_hosts")))
-        ssh.connect(
-            self.client.SITE_IP,
-            username=self.client.SSH_USER,
-            password=self.client.SSH_PASS,
-            banner_timeout=self.client.SSH_TIMEOUT_MS,
-        )
-        sftp = ssh.open_sftp()
-        sftp.put(file_src, file_dst)
-        sftp.close()
-        ssh.close()
+        # queue the file on a shared uploader, or upload it now
+        if uploader is not None:
+            uploader.add(file_src, file_dst)
+            return True
+        uploader = SFTPUploader(self.client, self.client_data_path)
+        uploader.add(file_src, file_dst)
+        SFTPUploader.raiseFailed(uploader.run())
         return True
 
     @staticmethod
-    def downloadImages(obj: Any, kind: str) -> None:
-        # download the image locally
-        data = None
-        if hasattr(obj, kind):
-            data = getattr(obj, kind)
-        elif hasattr(obj, f"_{kind}"):
-            data = getattr(obj, f"_{kind}")
-        if data:
-            for item in data:
-                if item.get("slug"):
-                    slug = item["slug"]
-                    file_parts = item["src"].split(".")
-                    file_ext = file_parts[-1]
-                    filename = f"{obj.wp_slug}-{slug}-{kind}.{file_ext}"
-                    save_to = ""
-                    if kind == "floorplans":
-                        save_to = "%s/%s" % (C.IMG_FLRP, filename)
-                    elif kind == "elevations":
-                        save_to = "%s/%s" % (C.IMG_ELV, filename)
-                    elif kind == "images":
-                        save_to = "%s/%s" % (C.IMG_PLN, filename)
-                    elif kind == "interiors":
-                        save_to = "%s/%s" % (C.IMG_INT, filename)
-                    if not os.path.isfile(save_to):
-                        urlretrieve(item["src"], save_to)
+    def downloadImages(obj: Any, kind: str, downloader: Any = None) -> None:
+        # queue the images on a shared downloader, or download them now
+        if downloader is not None:
+            downloader.add(obj, kind)
+            return
+        downloader = ImageDownloader()
+        downloader.add(obj, kind)
+        downloader.run()
+
+    @staticmethod
+    def syncImages(
+        objs: List,
+        kinds: List = ["elevations", "floorplans", "interiors", "images"],
+        max_workers: int = 8,
+    ) -> Dict[str, Dict[str, int]]:
+        # download every image of every record concurrently, once per source
+        downloader = ImageDownloader(max_workers=max_workers)
+        for obj in objs:
+            for kind in kinds:
+                downloader.add(obj, kind)
+        return downloader.run()
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import paramiko
+
+MANIFEST_FILE = "_sftp_manifest.json"
+
+
+class SFTPUploadError(Exception):
+    pass
+
+
+# ----------------------------------------------------------------------------------------
+# SFTP pooled, change-aware uploader
+class SFTPUploader:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<SFTPUploader %s (%d queued, %d workers)>" % (
+            self.client.SITE_IP,
+            len(self.jobs),
+            self.max_workers,
+        )
+
+    def __init__(
+        self,
+        client: Any,
+        local_dir: str,
+        max_workers: int = 4,
+    ) -> None:
+        """constructor"""
+        self.client = client
+        self.local_dir = local_dir
+        self.max_workers = max_workers
+        self.manifest_file = os.path.join(local_dir, MANIFEST_FILE)
+        self.manifest: Dict[str, Dict[str, Any]] = self.loadManifest()
+        # (local file, remote file) in the order they were queued
+        self.jobs: List[Tuple[str, str]] = []
+        self.report: Dict[str, Any] = {
+            "queued": 0,
+            "skipped": 0,
+            "uploaded": 0,
+            "failed": 0,
+            "bytes": 0,
+            "errors": [],
+        }
+        self.ssh: Any = None
+        self.sessions: List[Any] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connecting = threading.Lock()
+
+    def loadManifest(self) -> Dict[str, Dict[str, Any]]:
+        """remote file state recorded by the last upload"""
+        if os.path.isfile(self.manifest_file):
+            try:
+                with open(self.manifest_file, "r") as manifest:
+                    return json.load(manifest)
+            except ValueError:
+                return {}
+        return {}
+
+    def saveManifest(self) -> None:
+        """write the manifest atomically"""
+        with open(self.manifest_file + ".tmp", "w") as manifest:
+            json.dump(self.manifest, manifest, indent=2, sort_keys=True)
+        os.replace(self.manifest_file + ".tmp", self.manifest_file)
+
+    @staticmethod
+    def checksum(file: str) -> str:
+        """sha256 of a local file"""
+        digest = hashlib.sha256()
+        with open(file, "rb") as data:
+            for block in iter(lambda: data.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def add(self, file_src: str, file_dst: str) -> None:
+        """queue a local file for upload to a remote path"""
+        if (file_src, file_dst) not in self.jobs:
+            self.jobs.append((file_src, file_dst))
+            self.count("queued")
+
+    def count(self, key: str, value: int = 1) -> None:
+        """add to the report"""
+        with self._lock:
+            self.report[key] += value
+
+    def fail(self, file_dst: str, error: Exception) -> None:
+        """count a failed upload, and keep its error in the report"""
+        with self._lock:
+            self.report["failed"] += 1
+            self.report["errors"].append(
+                "%s: %s: %s" % (file_dst, type(error).__name__, error)
+            )
+
+    @staticmethod
+    def raiseFailed(report: Dict[str, Any]) -> None:
+        """raise the failed uploads of a report, if any"""
+        if report["failed"] > 0:
+            raise SFTPUploadError(
+                "%d upload(s) failed: %s"
+                % (report["failed"], "; ".join(report["errors"]))
+            )
+
+    def connect(self) -> Any:
+        """one ssh connection for the whole run, shared by every thread"""
+        with self._connecting:
+            if self.ssh is None:
+                ssh = paramiko.SSHClient()
+                ssh.load_host_keys(
+                    os.path.expanduser(os.path.join("~", ".ssh", "known_hosts"))
+                )
+                ssh.connect(
+                    self.client.SITE_IP,
+                    username=self.client.SSH_USER,
+                    password=self.client.SSH_PASS,
+                    banner_timeout=self.client.SSH_TIMEOUT_MS,
+                )
+                self.ssh = ssh
+        return self.ssh
+
+    def session(self) -> Any:
+        """this thread's sftp channel on the shared ssh connection"""
+        sftp = getattr(self._local, "sftp", None)
+        if sftp is None:
+            sftp = self._local.sftp = self.connect().open_sftp()
+            with self._lock:
+                self.sessions.append(sftp)
+        return sftp
+
+    def close(self) -> None:
+        """close every sftp channel and the ssh connection"""
+        for sftp in self.sessions:
+            sftp.close()
+        self.sessions = []
+        self._local = threading.local()
+        if self.ssh is not None:
+            self.ssh.close()
+            self.ssh = None
+
+    def isUnchanged(self, file_dst: str, sha256: str, size: int) -> bool:
+        """remote file is the one we uploaded last, from the same local content"""
+        known = self.manifest.get(file_dst)
+        if known is None or known["sha256"] != sha256 or known["size"] != size:
+            return False
+        try:
+            remote = self.session().stat(file_dst)
+        except IOError:
+            return False
+        return bool(
+            remote.st_size == known["size"] and remote.st_mtime == known["mtime"]
+        )
+
+    def removeRemote(self, file_dst: str) -> None:
+        """remove a remote (temp) file, if it is there"""
+        try:
+            self.session().remove(file_dst)
+        except Exception:
+            # never uploaded, or the connection is gone
+            pass
+
+    def run(self) -> Dict[str, Any]:
+        """upload every new or changed queued file, concurrently, on one connection"""
+        jobs = self.jobs
+        self.jobs = []
+        if len(jobs) == 0:
+            return self.report
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(lambda job: self.upload(*job), jobs))
+        finally:
+            self.close()
+        for file_dst, state in results:
+            if state is not None:
+                self.manifest[file_dst] = state
+        self.saveManifest()
+        return self.report
+
+    def upload(self, file_src: str, file_dst: str) -> Tuple[str, Dict[str, Any] | None]:
+        """put one file under a temp name, then rename it over the remote file"""
+        tmp_file = None
+        try:
+            sha256 = self.checksum(file_src)
+            size = os.path.getsize(file_src)
+            if self.isUnchanged(file_dst, sha256, size):
+                self.count("skipped")
+                return file_dst, None
+            sftp = self.session()
+            tmp_file = "%s.%s.tmp" % (file_dst, threading.get_ident())
+            sftp.put(file_src, tmp_file)
+            # readers never see a partially uploaded file
+            sftp.posix_rename(tmp_file, file_dst)
+            tmp_file = None
+            remote = sftp.stat(file_dst)
+        except Exception as e:
+            if tmp_file is not None:
+                self.removeRemote(tmp_file)
+            self.fail(file_dst, e)
+            return file_dst, None
+        self.count("uploaded")
+        self.count("bytes", size)
+        return file_dst, {
+            "sha256": sha256,
+            "size": remote.st_size,
+            "mtime": remote.st_mtime,
+        }
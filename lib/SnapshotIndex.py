@@ -0,0 +1,146 @@
+import hashlib
+import os
+import re
+import sqlite3
+from typing import Any, Dict, List, Tuple
+
+from lib import constants as C
+
+INDEX_FILE = "_snapshots.sqlite"
+SNAPSHOT_DATE = re.compile(r"-(\d{4})-(\d{2})-(\d{2})\.\w+$")
+
+
+# ----------------------------------------------------------------------------------------
+# CLIENT snapshot manifest index
+class SnapshotIndex:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<SnapshotIndex client='%s'>" % (self.client_key)
+
+    def __init__(self, key: str, path: str | None = None) -> None:
+        """constructor"""
+        self.client_key = key
+        self.path = path or "%s/%s" % (C.DATA_PATH, key)
+        self.db = sqlite3.connect(os.path.join(self.path, INDEX_FILE), timeout=30)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS snapshots (
+                client TEXT NOT NULL,
+                file TEXT NOT NULL,
+                type TEXT NOT NULL,
+                ext TEXT NOT NULL,
+                date TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (client, file)
+            )"""
+        )
+        self.db.execute(
+            """CREATE INDEX IF NOT EXISTS snapshots_by_date
+                ON snapshots (client, ext, date)"""
+        )
+        self.db.commit()
+
+    def __enter__(self) -> "SnapshotIndex":
+        """context manager, the index is closed on exit"""
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        """close the index database"""
+        self.close()
+
+    def close(self) -> None:
+        """close the index database"""
+        self.db.close()
+
+    @staticmethod
+    def snapshotDate(file: str) -> str | None:
+        """YYYY-MM-DD of a dated snapshot file name, None for anything else"""
+        match = SNAPSHOT_DATE.search(file)
+        if match is None:
+            return None
+        return "-".join(match.groups())
+
+    def snapshotType(self, file: str) -> str:
+        """snapshot data type, plans for KEY-plans-DATE.csv, xml for KEY-DATE.xml"""
+        name = SNAPSHOT_DATE.sub("", file)
+        prefix = "%s-" % (self.client_key)
+        if name.startswith(prefix):
+            return name.replace(prefix, "", 1)
+        return file.split(".")[-1]
+
+    @staticmethod
+    def checksum(file: str) -> str:
+        """sha256 of a local file"""
+        digest = hashlib.sha256()
+        with open(file, "rb") as data:
+            for block in iter(lambda: data.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def known(self) -> Dict[str, Tuple[int, int]]:
+        """file -> (size, mtime) of every indexed snapshot"""
+        rows = self.db.execute(
+            "SELECT file, size, mtime FROM snapshots WHERE client = ?",
+            (self.client_key,),
+        )
+        return {file: (size, mtime) for file, size, mtime in rows}
+
+    def refresh(self) -> int:
+        """index new or changed snapshot files and drop removed ones"""
+        known = self.known()
+        changed = 0
+        seen = set()
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.name[0] in ["_", "."] or not entry.is_file():
+                    continue
+                if self.snapshotDate(entry.name) is None:
+                    continue
+                seen.add(entry.name)
+                stat = entry.stat()
+                # only hash files the index has not seen in this state
+                if known.get(entry.name) != (stat.st_size, stat.st_mtime_ns):
+                    self.add(entry.name, stat, commit=False)
+                    changed += 1
+        for file in set(known) - seen:
+            self.db.execute(
+                "DELETE FROM snapshots WHERE client = ? AND file = ?",
+                (self.client_key, file),
+            )
+            changed += 1
+        self.db.commit()
+        return changed
+
+    def add(self, file: str, stat: Any = None, commit: bool = True) -> None:
+        """index (or re-index) one snapshot file"""
+        date = self.snapshotDate(file)
+        if date is None:
+            return
+        file_path = os.path.join(self.path, file)
+        if stat is None:
+            stat = os.stat(file_path)
+        self.db.execute(
+            "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.client_key,
+                file,
+                self.snapshotType(file),
+                file.split(".")[-1],
+                date,
+                stat.st_size,
+                stat.st_mtime_ns,
+                self.checksum(file_path),
+            ),
+        )
+        if commit:
+            self.db.commit()
+
+    def files(self, exts: List[str]) -> List[str]:
+        """snapshot files of the given extensions, newest date first"""
+        rows = self.db.execute(
+            "SELECT file FROM snapshots WHERE client = ? AND ext IN (%s)"
+            " ORDER BY date DESC, file" % ", ".join("?" * len(exts)),
+            (self.client_key, *exts),
+        )
+        return [file for (file,) in rows]
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import pickle
+import zlib
+from typing import Any, Dict, List, Tuple
+
+from lib import constants as C
+from lib.DataSoup import PARSER_VERSION
+
+
+# ----------------------------------------------------------------------------------------
+# BDX compiled soup snapshot cache
+class SoupCache:
+    def __repr__(self) -> str:
+        """representation"""
+        return "<SoupCache %s (%d entries)>" % (self.path, len(self.entries()))
+
+    def __init__(
+        self, path: str | None = None, max_bytes: int = C.CACHE_MAX_BYTES
+    ) -> None:
+        """constructor"""
+        self.path = path or C.CACHE_PATH
+        self.max_bytes = max_bytes
+        # (feed, size, mtime) -> content hash, a feed is hashed once per cache
+        self.digests: Dict[Tuple[str, int, int], bytes] = {}
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+    def key(self, resource: str, client: Any) -> str:
+        """snapshot key: feed content hash, parser version and client filters"""
+        digest = hashlib.sha256(self.feedDigest(resource))
+        digest.update(("parser:%s" % PARSER_VERSION).encode("utf-8"))
+        digest.update(
+            json.dumps(
+                [client.WP_CPT_SLUG_ID, client.NAME_FILTER_LIST], sort_keys=True
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def feedDigest(self, resource: str) -> bytes:
+        """content hash of a feed file"""
+        stat = os.stat(resource)
+        feed_key = (os.path.abspath(resource), stat.st_size, stat.st_mtime_ns)
+        if feed_key not in self.digests:
+            digest = hashlib.sha256()
+            with open(resource, "rb") as feed:
+                for block in iter(lambda: feed.read(1024 * 1024), b""):
+                    digest.update(block)
+            self.digests[feed_key] = digest.digest()
+        return self.digests[feed_key]
+
+    def contains(self, resource: str, client: Any) -> bool:
+        """a snapshot of this feed is cached"""
+        return os.path.isfile(self.entry(self.key(resource, client)))
+
+    def entry(self, key: str) -> str:
+        """path to the snapshot for key"""
+        return "%s/%s.soup" % (self.path, key)
+
+    def entries(self) -> List[str]:
+        """all snapshot paths, oldest first"""
+        files = []
+        for file in os.listdir(self.path):
+            if file.endswith(".soup"):
+                try:
+                    snapshot = "%s/%s" % (self.path, file)
+                    files.append((os.path.getmtime(snapshot), snapshot))
+                except FileNotFoundError:
+                    # evicted by another run
+                    continue
+        return [snapshot for _, snapshot in sorted(files)]
+
+    def load(self, soup: Any, resource: str) -> bool:
+        """fill a soup's raw and json data from its snapshot, if one is cached"""
+        snapshot = self.entry(self.key(resource, soup.client))
+        try:
+            with open(snapshot, "rb") as cached:
+                packed = cached.read()
+        except OSError:
+            # not cached, or evicted by another run
+            return False
+        try:
+            data = pickle.loads(zlib.decompress(packed))
+        except Exception:
+            # unreadable snapshot, drop it and reparse
+            self.remove(snapshot)
+            return False
+        soup.raw = data["raw"]
+        soup.json = data["json"]
+        soup.parts = data.get("parts", {})
+        try:
+            # mark the snapshot as recently used
+            os.utime(snapshot)
+        except OSError:
+            # evicted by another run after it was read
+            pass
+        return True
+
+    @staticmethod
+    def remove(snapshot: str) -> bool:
+        """remove a snapshot, False if another run already removed it"""
+        try:
+            os.remove(snapshot)
+            return True
+        except OSError:
+            return False
+
+    def save(self, soup: Any, resource: str) -> bool:
+        """write a soup's raw and json data to its snapshot"""
+        snapshot = self.entry(self.key(resource, soup.client))
+        data = {"raw": soup.raw, "json": soup.json, "parts": soup.parts}
+        packed = zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        # a per process temp file, clients sharing the cache may save the same key
+        tmp = "%s.%d.tmp" % (snapshot, os.getpid())
+        with open(tmp, "wb") as cached:
+            cached.write(packed)
+        os.replace(tmp, snapshot)
+        self.evict()
+        return True
+
+    def invalidate(self, resource: str | None = None, client: Any = None) -> int:
+        """remove the snapshot for one feed, or every snapshot"""
+        if resource is not None and client is not None:
+            snapshots = [self.entry(self.key(resource, client))]
+        else:
+            snapshots = self.entries()
+        removed = 0
+        for snapshot in snapshots:
+            if self.remove(snapshot):
+                removed += 1
+        return removed
+
+    def evict(self) -> int:
+        """remove the oldest snapshots (keeping the newest) to fit the size cap"""
+        snapshots = self.entries()
+        sizes = {}
+        for snapshot in snapshots:
+            try:
+                sizes[snapshot] = os.path.getsize(snapshot)
+            except OSError:
+                # evicted by another run
+                continue
+        total = sum(sizes.values())
+        removed = 0
+        while len(snapshots) > 1 and total > self.max_bytes:
+            oldest = snapshots.pop(0)
+            total -= sizes.get(oldest, 0)
+            # False when evicted by another run
+            if self.remove(oldest):
+                removed += 1
+        return removed
@@ -1,13 +1,35 @@
 import json
 from functools import lru_cache
 from os import environ
-from typing import Dict, List
+from typing import Any, Dict, List
 
 from dotenv import load_dotenv
 from pydantic import BaseConfig, validator
 
 load_dotenv()
 
+# multi client runs
+BDX_CLIENTS_FILE: str = environ.get("BDX_CLIENTS_FILE", "clients.json")
+BDX_MAX_PARALLEL_CLIENTS: int = int(environ.get("BDX_MAX_PARALLEL_CLIENTS", "4"))
+
+# add a stage timing summary line to the reports
+BDX_REPORT_METRICS: bool = environ.get("BDX_REPORT_METRICS", "0") == "1"
+
+# worker processes for a single client's feed ingest (0 ingests in process)
+BDX_INGEST_WORKERS: int = int(environ.get("BDX_INGEST_WORKERS", "0"))
+
+
+def parse_name_filter_list(value: str) -> List[str]:
+    # "['Filter This - ', ' and This One']" -> ["Filter This - ", " and This One"]
+    return (
+        value.replace("\n", "")
+        .replace("\r", "")
+        .replace("\t", "")
+        .replace("'", "")
+        .strip("][")
+        .split(",")
+    )
+
 
 class CLIENT(BaseConfig):
     # SSH host vars
@@ -70,14 +92,8 @@ class CLIENT(BaseConfig):
         return value
 
     # Filters
-    NAME_FILTER_LIST: List[str] | List = (
+    NAME_FILTER_LIST: List[str] | List = parse_name_filter_list(
         environ.get("NAME_FILTER_LIST", "[]")
-        .replace("\n", "")
-        .replace("\r", "")
-        .replace("\t", "")
-        .replace("'", "")
-        .strip("][")
-        .split(",")
     )
 
     # WP ID Tagging
@@ -87,3 +103,24 @@ class CLIENT(BaseConfig):
 @lru_cache
 def get_client() -> CLIENT:
     return CLIENT()
+
+
+def make_client(settings: Dict[str, Any]) -> CLIENT:
+    # a CLIENT with per client settings (same keys as the .env file)
+    client = CLIENT()
+    for key, value in settings.items():
+        if key == "NAME_FILTER_LIST" and isinstance(value, str):
+            value = parse_name_filter_list(value)
+        if key == "WP_CPT_SLUG_ID" and isinstance(value, str):
+            value = json.loads(value)
+        setattr(client, key, value)
+    if not client.BDX_FEED_XML_FILE_ID:
+        raise ValueError("BDX_FEED_XML_FILE_ID is not set")
+    client.SSH_HOST = "%s.%s" % (client.SITE_ROOT, client.SITE_TLD)
+    return client
+
+
+def get_clients(clients_file: str = BDX_CLIENTS_FILE) -> List[CLIENT]:
+    # load every client from a json list of client settings
+    with open(clients_file, "r") as clients_json:
+        return [make_client(settings) for settings in json.load(clients_json)]
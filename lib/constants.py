@@ -2,6 +2,8 @@ import os
 
 HERE = "/".join(os.path.dirname(os.path.realpath(__file__)).split("/")[:-1])
 DATA_PATH = HERE + "/data"
+CACHE_PATH = DATA_PATH + "/_cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
 LIB = HERE + "/lib"
 IMG = HERE + "/images"
 IMG_PLN = IMG + "/planimgs"
@@ -1,24 +1,115 @@
 import re
 import unicodedata
-from typing import Any, Dict, List
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
 
 from phpserialize import dumps  # type: ignore
 
+# compiled slugify patterns
+SLUG_STRIP = re.compile(r"[^\w\s-]")
+SLUG_DASHES = re.compile(r"[-\s]+")
+
 
 def getDict(obj: object) -> Dict[str, Any]:
-    # as dict
-    tmp_dict = {}
-    data_attrs = [
-        a for a in dir(obj) if not a.startswith("_") and not callable(getattr(obj, a))
+    # as dict, with the serializer compiled for this record class
+    return getSerializer(type(obj)).serialize(obj)
+
+
+def getFields(cls: type) -> List[str]:
+    # data attribute names of a record class, in the order getDict emits them
+    return [
+        a
+        for a in dir(cls)
+        if not a.startswith("_") and not callable(getattr(cls, a, None))
     ]
-    for attribute in data_attrs:
-        if getattr(obj, attribute):
-            tmp_attr = getattr(obj, attribute)
-            if type(tmp_attr) is list:
-                tmp_dict[attribute] = dumps(tmp_attr).decode("utf-8")
-            else:
-                tmp_dict[attribute] = tmp_attr
-    return tmp_dict
+
+
+class BDXSerializer:
+    # compiled record -> dict serializer for one record class
+    def __init__(self, cls: type) -> None:
+        self.cls = cls
+        # fixed, ordered data fields, resolved once instead of per record
+        self.fields = getFields(cls)
+        self.encoders: Dict[type, Any] = {list: self.encodeList}
+
+    @staticmethod
+    def encodeList(value: list) -> str:
+        # lists are php serialized for the WP import
+        return phpSerialize(value)
+
+    def serialize(self, obj: object) -> Dict[str, Any]:
+        tmp_dict = {}
+        encoders = self.encoders
+        for field in self.fields:
+            # unset __slots__ fields read as None, and are skipped like empty values
+            value = getattr(obj, field, None)
+            if value:
+                encoder = encoders.get(type(value))
+                tmp_dict[field] = encoder(value) if encoder else value
+        return tmp_dict
+
+
+def phpString(value: str) -> str:
+    # php serialized string, its length counted in utf-8 bytes
+    size = len(value) if value.isascii() else len(value.encode("utf-8"))
+    return 's:%d:"%s";' % (size, value)
+
+
+def phpValue(value: Any) -> str:
+    # php serialized str or int
+    return phpString(value) if type(value) is str else "i:%d;" % value
+
+
+@lru_cache(maxsize=4096)
+def phpSerializeValues(values: Tuple) -> str:
+    # a list of str and int values, like relationship ids
+    return "a:%d:{%s}" % (
+        len(values),
+        "".join("i:%d;%s" % (i, phpValue(value)) for i, value in enumerate(values)),
+    )
+
+
+@lru_cache(maxsize=4096)
+def phpSerializeRecords(records: Tuple) -> str:
+    # a list of flat dicts (as item tuples), like image data
+    return "a:%d:{%s}" % (
+        len(records),
+        "".join(
+            "i:%d;a:%d:{%s}"
+            % (i, len(items), "".join(phpString(k) + phpValue(v) for k, v in items))
+            for i, items in enumerate(records)
+        ),
+    )
+
+
+def isPHPValue(value: Any) -> bool:
+    # exactly str or int, bool and subclasses serialize differently
+    return type(value) is str or type(value) is int
+
+
+def phpSerialize(value: list) -> str:
+    # php serialized list for the WP import, the same as phpserialize.dumps
+    # (decoded), with the common shapes encoded directly and memoized
+    if all(isPHPValue(item) for item in value):
+        return phpSerializeValues(tuple(value))
+    if all(type(item) is dict for item in value):
+        records = tuple(tuple(item.items()) for item in value)
+        if all(type(k) is str and isPHPValue(v) for items in records for k, v in items):
+            return phpSerializeRecords(records)
+    return dumps(value).decode("utf-8")
+
+
+_serializers: Dict[type, BDXSerializer] = {}
+
+
+def getSerializer(cls: type) -> BDXSerializer:
+    # compile once per record class
+    serializer = _serializers.get(cls)
+    if serializer is None:
+        serializer = BDXSerializer(cls)
+        _serializers[cls] = serializer
+    return serializer
 
 
 def unpackOrderedDict(dictionary: Dict[str, Any]) -> Dict[str, Any]:
@@ -50,17 +141,30 @@ def trimEndSpaces(string: str) -> str:
 
 def slugify(value: Any, allow_unicode: bool = False) -> str:
     # Slugify => https://github.com/django/django/blob/master/django/utils/text.py
-    value = str(value)
-    if allow_unicode:
-        value = unicodedata.normalize("NFKC", value)
-    else:
-        value = (
-            unicodedata.normalize("NFKD", value)
-            .encode("ascii", "ignore")
-            .decode("ascii")
-        )
-    value = re.sub(r"[^\w\s-]", "", value.lower())
-    return re.sub(r"[-\s]+", "-", value).strip("-_")
+    return slugifyText(str(value), allow_unicode)
+
+
+@lru_cache(maxsize=8192)
+def slugifyText(value: str, allow_unicode: bool = False) -> str:
+    # ascii text is unchanged by unicode normalization
+    if not value.isascii():
+        if allow_unicode:
+            value = unicodedata.normalize("NFKC", value)
+        else:
+            value = (
+                unicodedata.normalize("NFKD", value)
+                .encode("ascii", "ignore")
+                .decode("ascii")
+            )
+    value = SLUG_STRIP.sub("", value.lower())
+    return SLUG_DASHES.sub("-", value).strip("-_")
+
+
+def slugifyAll(values: Iterable[Any], allow_unicode: bool = False) -> List[str]:
+    # slugify a column of values, each distinct value once
+    values = list(values)
+    slugs = {value: slugify(value, allow_unicode) for value in set(values)}
+    return [slugs[value] for value in values]
 
 
 def sumDictKeyValues(dictionary: Dict[str, Any]) -> str:
@@ -71,13 +175,7 @@ def sumDictKeyValues(dictionary: Dict[str, Any]) -> str:
 
 
 def filterName(filter_list: list, name: str) -> str:
-    for rm_str in filter_list:
-        name = "".join(name.split(rm_str))
-    if "- " in name:
-        name = re.sub(r"- ", " ", name)
-    if " -" in name:
-        name = re.sub(r" -", " ", name)
-    return name
+    return getNameFilter(filter_list).filterName(name)
 
 
 def formatImageData(key: str, slug: str, data_list: list) -> List[Dict] | List:
@@ -104,19 +202,114 @@ def formatImageData(key: str, slug: str, data_list: list) -> List[Dict] | List:
         return [{}]
 
 
+class BDXWPIDMatcher:
+    # compiled slug -> WP ID matcher for one client WP_CPT_SLUG_ID map
+    SEP = "\x00"
+
+    def __init__(self, haystack: Dict[str, Any]) -> None:
+        # a copy, so later edits of the client map can't desync the index
+        self.haystack = dict(haystack)
+        self.keys = list(self.haystack.keys())
+        # all keys in one string, so a substring search is one C level find
+        self.barrels = self.SEP.join(self.keys)
+        self.starts = []
+        offset = 0
+        for barrel in self.keys:
+            self.starts.append(offset)
+            offset += len(barrel) + len(self.SEP)
+        self.straws: Dict[str, Any] = {}
+        self.memo: Dict[Any, Any] = {}
+
+    def firstBarrel(self, straw: str) -> Any:
+        # first key (in map order) containing straw, or None
+        if straw in self.straws:
+            return self.straws[straw]
+        barrel = None
+        if self.keys:
+            if self.SEP in straw:
+                barrel = next((k for k in self.keys if straw in k), None)
+            else:
+                found = self.barrels.find(straw)
+                if found != -1:
+                    barrel = self.keys[bisect_right(self.starts, found) - 1]
+        self.straws[straw] = barrel
+        return barrel
+
+    def match(self, needle: Any) -> Any:
+        if needle in self.memo:
+            return self.memo[needle]
+        wp_id = -1
+        # if matching BDX slug indexed
+        if needle in self.haystack:
+            wp_id = self.haystack[needle]
+        else:
+            # search the needle substrings in the haystack keys
+            for straw in needle.split("-"):
+                barrel = self.firstBarrel(straw)
+                if barrel is not None:
+                    wp_id = self.haystack[barrel]
+                    break
+        self.memo[needle] = wp_id
+        return wp_id
+
+
+def getWPIDMatcher(haystack: Any) -> BDXWPIDMatcher:
+    # compile once per client slug map, keyed on its contents so an edited map
+    # is recompiled; the key is a pass over the map, so callers matching many
+    # records compile once and pass the matcher in place of the map
+    if isinstance(haystack, BDXWPIDMatcher):
+        return haystack
+    return compileWPIDMatcher(tuple(haystack.items()))
+
+
+@lru_cache(maxsize=32)
+def compileWPIDMatcher(items: Tuple[Tuple[str, Any], ...]) -> BDXWPIDMatcher:
+    return BDXWPIDMatcher(dict(items))
+
+
+class BDXNameFilter:
+    # compiled name filter for one client NAME_FILTER_LIST
+    def __init__(self, filter_list: Iterable[str], size: int = 8192) -> None:
+        self.filter_list = tuple(filter_list)
+        # empty strings filter nothing
+        self.filters = tuple(rm_str for rm_str in self.filter_list if rm_str)
+        # every filter string in one alternation, so most names are one search
+        self.pattern = (
+            re.compile("|".join(map(re.escape, self.filters))) if self.filters else None
+        )
+        self.filterName = lru_cache(maxsize=size)(self.filterText)
+
+    def filterText(self, name: str) -> str:
+        # a removal can join text into a later filter string, so names that
+        # hit the pattern keep the list order removal
+        if self.pattern is not None and self.pattern.search(name):
+            for rm_str in self.filters:
+                name = name.replace(rm_str, "")
+        if "- " in name:
+            name = name.replace("- ", " ")
+        if " -" in name:
+            name = name.replace(" -", " ")
+        return name
+
+    def filterNames(self, names: Iterable[str]) -> List[str]:
+        # filter a column of names, each distinct name once
+        names = list(names)
+        filtered = {name: self.filterName(name) for name in set(names)}
+        return [filtered[name] for name in names]
+
+
+def getNameFilter(filter_list: Iterable[str]) -> BDXNameFilter:
+    # compile once per client filter list, keyed on its contents so a changed
+    # list is recompiled and an unused one is eventually evicted
+    return compileNameFilter(tuple(filter_list))
+
+
+@lru_cache(maxsize=32)
+def compileNameFilter(filters: Tuple[str, ...]) -> BDXNameFilter:
+    return BDXNameFilter(filters)
+
+
 def BDXgetMatchingWPID(needle: Any, haystack: Any) -> Any:
-    # if matching BDX slug indexed
-    if needle in haystack:
-        # return this BDX slug's WP ID
-        return haystack[needle]
-    else:
-        # search the needle substrings
-        needles = needle.split("-")
-        for straw in needles:
-            # in the haystack keys
-            for barrel in haystack.keys():
-                if straw in barrel:
-                    # return this BDX slug's WP ID
-                    return haystack[barrel]
-        # return no ID found
-        return -1
+    # return this BDX slug's WP ID, or -1 if no ID found
+    # haystack is a client slug map, or its compiled BDXWPIDMatcher
+    return getWPIDMatcher(haystack).match(needle)
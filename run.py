@@ -1,7 +1,8 @@
+from typing import List
+
 from knockknock import slack_sender
 
-from lib.config import get_client
-from lib.DataSoup import BDXDataSoup
+from lib.config import BDX_INGEST_WORKERS, BDX_REPORT_METRICS, get_client
 from lib.PyBDXBuilder import PyBDX
 
 # load Client from environment
@@ -14,97 +15,24 @@ CLIENT = get_client()
     user_mentions=["joey@getcommunity.com"],
 )
 def fetch_bdx_pricing() -> str:
-    output_message = []
+    output_message: List[str] = []
     try:
         # run PyBDX
         BDX: PyBDX = PyBDX(
-            client=CLIENT, download=True, analyze=True, convert=True, upload=False
-        )
-        # print(BDX)
-        # exit()
-        # Load current data
-        cur_file = f"{BDX.xml_files.data[0].src}/{BDX.xml_files.data[0].file}"
-        BDX_curr: BDXDataSoup | None = BDX.ReheatSoup(cur_file, CLIENT)
-        if not isinstance(BDX_curr, BDXDataSoup):
-            raise Exception("BDXDataSoup not found")
-
-        # append data source info
-        cur_data_source = "Current: %d plans found in %s" % (
-            len(BDX_curr.raw["plans"]),
-            cur_file,
+            client=CLIENT,
+            download=True,
+            analyze=True,
+            convert=True,
+            upload=False,
+            ingest_workers=BDX_INGEST_WORKERS,
         )
-        output_message.append(cur_data_source)
-
-        # Load previous data if applicable
-        BDX_prev: BDXDataSoup | None = None
-        if len(BDX.xml_files.data) > 1:
-            prev_file = f"{BDX.xml_files.data[0].src}/{BDX.xml_files.data[1].file}"
-            BDX_prev = BDX.ReheatSoup(prev_file, CLIENT)
-            if not isinstance(BDX_prev, BDXDataSoup):
-                raise Exception("Previous BDXDataSoup not found")
-            prev_data_source = "Previous: %d plans found in %s" % (
-                len(BDX_prev.raw["plans"]),
-                prev_file,
-            )
-            output_message.append(prev_data_source)
-
-        output_message.append(16 * "----")
-
-        # loop current and previous plans
-        for i, cur_plan in enumerate(BDX_curr.raw["plans"]):
-            # current plan builder and subdiv
-            cp_builder = (
-                BDX.findMatchingCPT(
-                    needle=cur_plan.builder[0], haystack=BDX_curr.raw["builders"]
-                )
-                if len(cur_plan.builder) > 0
-                else None
-            )
-            cp_subdiv = (
-                BDX.findMatchingCPT(
-                    needle=cur_plan.subdiv[0], haystack=BDX_curr.raw["subdivs"]
-                )
-                if len(cur_plan.subdiv) > 0
-                else None
-            )
-
-            prev_plan = None
-            if BDX_prev is not None:
-                # previous plan, builder, and subdiv
-                prev_plan = (
-                    BDX.findMatchingPlan(
-                        needle=cur_plan, haystack=BDX_prev.raw["plans"]
-                    )
-                    or None
-                )
-                pp_builder = (
-                    BDX.findMatchingCPT(
-                        needle=prev_plan.builder, haystack=BDX_prev.raw["builders"]
-                    )
-                    if prev_plan and len(prev_plan.builder) > 0
-                    else None
-                )
-                pp_subdiv = (
-                    BDX.findMatchingCPT(
-                        needle=prev_plan.subdiv, haystack=BDX_prev.raw["subdivs"]
-                    )
-                    if prev_plan and len(prev_plan.subdiv) > 0
-                    else None
-                )
-
-            # calculate any observed pricing changes, or get current plan price
-            plan_price = BDX.calcPlanPricing(prev_plan, cur_plan)
-
-            # print current plan info
-            if cp_builder is not None:
-                output_message.append(cp_builder.name)
-            if cp_subdiv is not None:
-                output_message.append(cp_subdiv.name)
-            output_message.append(cur_plan.name)
-            output_message.append(plan_price)
-            output_message.append("")
+        # compare current and previous pricing
+        BDX.pricingReport(output_message)
+        # where the run spent its time
+        if BDX_REPORT_METRICS:
+            output_message.append(BDX.metrics.summary())
     except Exception as e:
-        output_message.append("ERROR:")
+        output_message.append("ERROR: %s" % (e))
         print(e)
     finally:
         output_str = "\n".join(output_message)
@@ -0,0 +1,29 @@
+from knockknock import slack_sender
+
+from lib.ClientRunner import formatReport, runClients
+from lib.config import BDX_MAX_PARALLEL_CLIENTS, get_client, get_clients
+
+# load Clients from the clients file, and report settings from environment
+CLIENT = get_client()
+CLIENTS = get_clients()
+
+
+@slack_sender(
+    webhook_url=CLIENT.REPORT_AUTOMATION_WEBHOOK,
+    channel="report-automation",
+    user_mentions=["joey@getcommunity.com"],
+)
+def fetch_all_bdx_pricing() -> str:
+    report = runClients(
+        CLIENTS,
+        max_workers=BDX_MAX_PARALLEL_CLIENTS,
+        download=True,
+        analyze=True,
+        convert=True,
+        upload=False,
+    )
+    return formatReport(report)
+
+
+if __name__ == "__main__":
+    print(fetch_all_bdx_pricing())
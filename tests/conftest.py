@@ -0,0 +1,28 @@
+from typing import Any
+
+import pytest
+
+from lib import constants as C
+from lib.config import make_client
+from lib.FeedGenerator import BDXFeedGenerator
+
+CLIENT_KEY = "T"
+
+
+@pytest.fixture(autouse=True)
+def data_path(tmp_path: Any, monkeypatch: Any) -> Any:
+    # every test works in its own data directory
+    monkeypatch.setattr(C, "DATA_PATH", str(tmp_path / "data"))
+    monkeypatch.setattr(C, "CACHE_PATH", str(tmp_path / "data" / "_cache"))
+    (tmp_path / "data" / CLIENT_KEY).mkdir(parents=True)
+    return tmp_path / "data"
+
+
+@pytest.fixture
+def generator() -> BDXFeedGenerator:
+    return BDXFeedGenerator(builders=2, subdivisions=2, plans=3, images=1)
+
+
+@pytest.fixture
+def client(generator: BDXFeedGenerator) -> Any:
+    return make_client(generator.clientSettings(CLIENT_KEY))
@@ -0,0 +1,77 @@
+import io
+from typing import Any, Dict
+
+import pandas as pd
+import pytest
+
+from lib.DataSoup import RECORD_DTYPES, BDXDataSoup, typeColumns
+from lib.FeedGenerator import BDXFeedGenerator
+from tests.conftest import CLIENT_KEY
+
+
+def writeFeed(path: str, generator: BDXFeedGenerator, changed: bool = False) -> str:
+    # a generated feed, with an extra Builder without Subdivisions, and one
+    # changed Subdivision if changed
+    generator.write(path)
+    empty = io.StringIO()
+    generator.writeBuilder(empty, 0, 9)
+    empty.write("</Builder>\n")
+    with open(path, encoding="utf-8") as feed:
+        text = feed.read()
+    if changed:
+        text = text.replace("Now selling", "Sold out", 1)
+    with open(path, "w", encoding="utf-8") as feed:
+        feed.write(text.replace("</Builder>\n", "</Builder>\n" + empty.getvalue(), 1))
+    return path
+
+
+@pytest.mark.parametrize(
+    "mode, options, changed",
+    [
+        ("stream", {"stream": True}, False),
+        ("workers", {"stream": True, "workers": 2}, False),
+        ("previous", {"stream": True}, False),
+        ("previous", {"stream": True}, True),
+        ("previous", {"stream": True, "workers": 2}, True),
+    ],
+)
+def test_ingest_modes_match_the_serial_ingest(
+    data_path: Any,
+    generator: BDXFeedGenerator,
+    client: Any,
+    mode: str,
+    options: Dict[str, Any],
+    changed: bool,
+) -> None:
+    feed_path = str(data_path / CLIENT_KEY / ("%s-2023-01-02.xml" % CLIENT_KEY))
+    feed = writeFeed(feed_path, generator, changed)
+    serial = BDXDataSoup(feed, client, stream=False)
+    assert len(serial.json["builders"]) == generator.builders + 1
+    if mode == "previous":
+        previous_path = str(data_path / CLIENT_KEY / ("%s-2023-01-01.xml" % CLIENT_KEY))
+        previous = BDXDataSoup(writeFeed(previous_path, generator), client, stream=True)
+        options = {**options, "previous": previous}
+    soup = BDXDataSoup(feed, client, **options)
+    assert soup.json == serial.json
+    if mode == "previous":
+        # every unchanged subdivision is reused
+        reused = set(soup.parts) & set(options["previous"].parts)
+        assert len(reused) == len(soup.parts) - changed
+
+
+def test_typed_columns_do_not_depend_on_blanks() -> None:
+    # csv text of two days, the second one with blanks
+    full = pd.DataFrame(
+        {"actual_price": ["250000"], "num_baths": ["2"], "name": ["Oak"]}
+    )
+    blank = pd.DataFrame(
+        {"actual_price": ["", "1.5"], "num_baths": ["", "2.5"], "name": ["", "Elm"]}
+    )
+    full = typeColumns(full, "plans")
+    blank = typeColumns(blank, "plans")
+    assert full.dtypes.to_dict() == blank.dtypes.to_dict()
+    assert str(full["actual_price"].dtype) == RECORD_DTYPES["plans"]["actual_price"]
+    assert str(full["num_baths"].dtype) == RECORD_DTYPES["plans"]["num_baths"]
+    # a fraction is not a price
+    assert blank["actual_price"].isna().all()
+    assert blank["num_baths"].tolist()[1] == 2.5
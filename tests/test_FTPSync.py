@@ -0,0 +1,128 @@
+import os
+from ftplib import error_perm, error_reply, error_temp
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+from lib.FTPSync import MANIFEST_FILE, FTPSync
+
+
+class LocalFTP:
+    # ftplib.FTP stand-in, serving in-memory files
+    def __init__(self) -> None:
+        self.files: Dict[str, bytes] = {}
+        self.mtimes: Dict[str, str] = {}
+        # command -> exception raised instead of replying
+        self.fail: Dict[str, Exception] = {}
+        # bytes sent before a RETR drops the connection
+        self.drop_after: int | None = None
+        self.retrieved: List[Tuple[str, int | None]] = []
+
+    def put(self, file: str, data: bytes, mtime: str) -> None:
+        self.files[file] = data
+        self.mtimes[file] = mtime
+
+    def nlst(self) -> List[str]:
+        return sorted(self.files)
+
+    def size(self, file: str) -> int:
+        if "SIZE" in self.fail:
+            raise self.fail["SIZE"]
+        return len(self.files[file])
+
+    def voidcmd(self, cmd: str) -> str:
+        if cmd.startswith("MDTM"):
+            if "MDTM" in self.fail:
+                raise self.fail["MDTM"]
+            return "213 " + self.mtimes[cmd.split()[1]]
+        return "200 " + cmd
+
+    def retrbinary(
+        self,
+        cmd: str,
+        callback: Callable[[bytes], Any],
+        blocksize: int,
+        rest: int | None = None,
+    ) -> None:
+        file = cmd.split()[1]
+        self.retrieved.append((file, rest))
+        data = self.files[file][rest:] if rest else self.files[file]
+        if self.drop_after is not None:
+            callback(data[: self.drop_after])
+            raise EOFError("connection closed")
+        while data:
+            callback(data[:blocksize])
+            data = data[blocksize:]
+
+
+@pytest.fixture
+def ftp() -> LocalFTP:
+    ftp = LocalFTP()
+    ftp.put("A.zip", b"a" * 5000, "20230101000000")
+    ftp.put("B.zip", b"b" * 3000, "20230101000000")
+    ftp.put("notes.txt", b"skip me", "20230101000000")
+    return ftp
+
+
+def sync(ftp: LocalFTP, local: Any, **options: Any) -> List[str]:
+    syncer = FTPSync(ftp, str(local), block_size=1024)  # type: ignore[arg-type]
+    return sorted(os.path.basename(file) for file in syncer.sync(**options))
+
+
+def test_unchanged_files_are_skipped(ftp: LocalFTP, tmp_path: Any) -> None:
+    assert sync(ftp, tmp_path) == ["A.zip", "B.zip"]
+    assert sync(ftp, tmp_path) == []
+    ftp.put("B.zip", b"c" * 3000, "20230102000000")
+    assert sync(ftp, tmp_path) == ["B.zip"]
+    assert (tmp_path / "B.zip").read_bytes() == b"c" * 3000
+    assert sync(ftp, tmp_path, only_changed=False) == ["A.zip", "B.zip"]
+    assert (tmp_path / MANIFEST_FILE).is_file()
+
+
+def test_interrupted_download_resumes(ftp: LocalFTP, tmp_path: Any) -> None:
+    ftp.drop_after = 2000
+    with pytest.raises(EOFError):
+        sync(ftp, tmp_path)
+    assert (tmp_path / "A.zip.part").stat().st_size == 2000
+    ftp.drop_after = None
+    ftp.retrieved = []
+    assert sync(ftp, tmp_path) == ["A.zip", "B.zip"]
+    assert ftp.retrieved == [("A.zip", 2000), ("B.zip", None)]
+    assert (tmp_path / "A.zip").read_bytes() == b"a" * 5000
+    assert not (tmp_path / "A.zip.part").exists()
+
+
+def test_changed_file_restarts_partial_download(ftp: LocalFTP, tmp_path: Any) -> None:
+    ftp.drop_after = 2000
+    with pytest.raises(EOFError):
+        sync(ftp, tmp_path)
+    ftp.drop_after = None
+    ftp.retrieved = []
+    ftp.put("A.zip", b"z" * 5000, "20230102000000")
+    sync(ftp, tmp_path)
+    assert ftp.retrieved[0] == ("A.zip", None)
+    assert (tmp_path / "A.zip").read_bytes() == b"z" * 5000
+
+
+@pytest.mark.parametrize(
+    "error",
+    [error_perm("500 unknown command"), error_temp("450 busy"), error_reply("1xx")],
+)
+def test_missing_mdtm_always_downloads(
+    ftp: LocalFTP, tmp_path: Any, error: Exception
+) -> None:
+    ftp.fail["MDTM"] = error
+    assert sync(ftp, tmp_path) == ["A.zip", "B.zip"]
+    # a same-size rewrite is invisible to SIZE alone
+    ftp.put("A.zip", b"x" * 5000, "20230102000000")
+    assert sync(ftp, tmp_path) == ["A.zip", "B.zip"]
+    assert (tmp_path / "A.zip").read_bytes() == b"x" * 5000
+
+
+def test_size_errors_are_unknown_sizes(ftp: LocalFTP, tmp_path: Any) -> None:
+    ftp.fail["SIZE"] = error_temp("421 too many connections")
+    assert sync(ftp, tmp_path) == ["A.zip", "B.zip"]
+    assert sync(ftp, tmp_path) == ["A.zip", "B.zip"]
+    del ftp.fail["SIZE"]
+    sync(ftp, tmp_path)
+    assert sync(ftp, tmp_path) == []
@@ -0,0 +1,26 @@
+from typing import Any
+
+from lib.DataSoup import BDXDataSoup
+from lib.FeedGenerator import BDXFeedGenerator
+from lib.PyBDXBuilder import PyBDX
+
+
+def test_identical_feeds_diff_unchanged(
+    tmp_path: Any, generator: BDXFeedGenerator, client: Any
+) -> None:
+    files = [str(tmp_path / ("T-2023-01-0%d.xml" % day)) for day in [1, 2, 3]]
+    generator.write(files[0])
+    generator.write(files[1])
+    generator.write(files[2], price_shift=5000)
+    previous, same, shifted = [BDXDataSoup(file, client, stream=True) for file in files]
+    # every plan has its own builder, subdivision and name key
+    assert len(previous.index["plans"]) == generator.numPlans()
+    changes = PyBDX.calcPricingChanges(previous, same)
+    assert changes["unchanged"] == generator.numPlans()
+    changes = PyBDX.calcPricingChanges(previous, shifted)
+    # a third of the plans go up, a third down
+    assert (changes["increased"], changes["decreased"], changes["unchanged"]) == (
+        4,
+        4,
+        4,
+    )
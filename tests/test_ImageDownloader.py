@@ -0,0 +1,133 @@
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from lib import ImageDownloader as D
+from lib.ImageDownloader import ImageDownloader
+
+IMAGE = b"\x89PNG" + b"x" * 4096
+
+
+class ImageHost(BaseHTTPRequestHandler):
+    # http stand-in: images, redirects, missing files and flaky server errors
+    protocol_version = "HTTP/1.1"
+    requests: Counter = Counter()
+    failures: Dict[str, int] = {}
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def reply(self, status: int, body: bytes = b"", location: str = "") -> None:
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        ImageHost.requests[self.path] += 1
+        if ImageHost.failures.get(self.path, 0) > 0:
+            ImageHost.failures[self.path] -= 1
+            self.reply(503)
+        elif self.path == "/loop.png":
+            self.reply(302, location="/loop.png")
+        elif self.path == "/moved.png":
+            self.reply(301, location="/img.png")
+        elif self.path in ["/img.png", "/flaky.png"]:
+            self.reply(200, IMAGE)
+        else:
+            self.reply(404)
+
+
+@pytest.fixture
+def host() -> Iterator[str]:
+    ImageHost.requests = Counter()
+    ImageHost.failures = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHost)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:%d" % (server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def image_dirs(tmp_path: Any, monkeypatch: Any) -> Any:
+    for kind in D.IMAGE_DIRS:
+        (tmp_path / kind).mkdir()
+        monkeypatch.setitem(D.IMAGE_DIRS, kind, str(tmp_path / kind))
+    return tmp_path
+
+
+def plan(slug: str, *srcs: str) -> Any:
+    images = [{"slug": "%s-%d" % (slug, i), "src": src} for i, src in enumerate(srcs)]
+    return SimpleNamespace(wp_slug=slug, _elevations=images)
+
+
+def download(*plans: Any, **options: Any) -> ImageDownloader:
+    downloader = ImageDownloader(max_workers=2, **options)
+    for obj in plans:
+        downloader.add(obj, "elevations")
+    downloader.run()
+    return downloader
+
+
+def files(image_dirs: Any) -> List[str]:
+    return sorted(path.name for path in (image_dirs / "elevations").iterdir())
+
+
+def test_identical_sources_download_once(host: str, image_dirs: Any) -> None:
+    downloader = download(plan("a", host + "/img.png"), plan("b", host + "/img.png"))
+    report = downloader.report["elevations"]
+    assert (report["downloaded"], report["copied"], report["failed"]) == (1, 1, 0)
+    assert ImageHost.requests["/img.png"] == 1
+    assert files(image_dirs) == ["a-a-0-elevations.png", "b-b-0-elevations.png"]
+    assert downloader.connections == []
+    # files on disk are skipped on the next run
+    report = download(plan("a", host + "/img.png")).report["elevations"]
+    assert (report["skipped"], report["downloaded"]) == (1, 0)
+
+
+def test_server_errors_are_retried(host: str, image_dirs: Any) -> None:
+    ImageHost.failures["/flaky.png"] = 2
+    downloader = download(plan("a", host + "/flaky.png"))
+    assert downloader.report["elevations"]["downloaded"] == 1
+    assert ImageHost.requests["/flaky.png"] == 3
+
+
+def test_missing_images_are_reported_once(host: str, image_dirs: Any) -> None:
+    downloader = download(plan("a", host + "/missing.png"))
+    assert downloader.report["elevations"]["failed"] == 1
+    assert ImageHost.requests["/missing.png"] == 1
+    assert downloader.errors == [
+        "%s/missing.png: ImageDownloadError: HTTP 404 for %s/missing.png" % (host, host)
+    ]
+    assert files(image_dirs) == []
+
+
+def test_redirects_are_bounded(host: str, image_dirs: Any) -> None:
+    downloader = download(
+        plan("a", host + "/moved.png", host + "/loop.png"), max_redirects=3
+    )
+    assert downloader.report["elevations"]["downloaded"] == 1
+    assert downloader.report["elevations"]["failed"] == 1
+    # one request per hop, not multiplied by the retries
+    assert ImageHost.requests["/loop.png"] == 4
+    assert "more than 3 redirects" in downloader.errors[0]
+
+
+def test_failed_copies_are_reported(
+    host: str, image_dirs: Any, monkeypatch: Any
+) -> None:
+    def copyfile(src: str, dst: str) -> None:
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(D.shutil, "copyfile", copyfile)
+    downloader = download(plan("a", host + "/img.png"), plan("b", host + "/img.png"))
+    report = downloader.report["elevations"]
+    assert (report["downloaded"], report["copied"], report["failed"]) == (1, 0, 1)
+    assert downloader.errors == ["%s/img.png: PermissionError: read-only" % (host)]
@@ -0,0 +1,144 @@
+import io
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.DataSoup import BDXDataSoup
+from lib.FeedGenerator import BDXFeedGenerator
+from lib.PriceHistory import PriceHistory
+from lib.PyBDXBuilder import PyBDX, packColumns, unpackColumns
+from lib.SoupCache import SoupCache
+from tests.conftest import CLIENT_KEY
+
+
+def test_archive_reads_xml_snapshots_before_the_first_zip(
+    data_path: Any, generator: BDXFeedGenerator, client: Any
+) -> None:
+    # an existing client turning archiving on, with only xml snapshots on disk
+    generator.write(str(data_path / CLIENT_KEY / ("%s-2023-01-01.xml" % CLIENT_KEY)))
+    bdx = PyBDX(client, analyze=True, archive=True)
+    assert bdx.metrics.counters["ingest_plans"] == generator.numPlans()
+    assert not (data_path / CLIENT_KEY / bdx.zip_file_today).exists()
+
+
+def test_archive_without_snapshots_raises(client: Any) -> None:
+    with pytest.raises(FileNotFoundError, match="no zip or xml snapshot"):
+        PyBDX(client, analyze=True, archive=True)
+
+
+@pytest.fixture
+def ingests(monkeypatch: Any) -> Dict[str, int]:
+    # count full parses and reused subdivisions
+    counts = {"parsed": 0, "reused": 0}
+    ingest_stream = BDXDataSoup.ingestStream
+    reuse = BDXDataSoup.reuseSubdivision
+
+    def counted_ingest(self: BDXDataSoup, *args: Any) -> bool:
+        counts["parsed"] += 1
+        return ingest_stream(self, *args)
+
+    def counted_reuse(self: BDXDataSoup, *args: Any) -> Any:
+        counts["reused"] += 1
+        return reuse(self, *args)
+
+    monkeypatch.setattr(BDXDataSoup, "ingestStream", counted_ingest)
+    monkeypatch.setattr(BDXDataSoup, "reuseSubdivision", counted_reuse)
+    return counts
+
+
+def test_full_ingest_rebuilds_the_cached_snapshot(
+    data_path: Any, generator: BDXFeedGenerator, client: Any, ingests: Dict[str, int]
+) -> None:
+    generator.write(str(data_path / CLIENT_KEY / ("%s-2023-01-01.xml" % CLIENT_KEY)))
+    generator.write(str(data_path / CLIENT_KEY / ("%s.xml" % CLIENT_KEY)))
+    # the uncached previous feed is not parsed just to reuse its subtrees
+    PyBDX(client, analyze=True)
+    assert ingests == {"parsed": 1, "reused": 0}
+    PyBDX(client, analyze=True)
+    assert ingests == {"parsed": 1, "reused": 0}
+    bdx = PyBDX(client, analyze=True, full_ingest=True)
+    assert ingests == {"parsed": 2, "reused": 0}
+    assert bdx.metrics.counters["ingest_plans"] == generator.numPlans()
+    assert len(SoupCache().entries()) == 1
+
+
+def test_cached_previous_feed_is_reused(
+    data_path: Any, generator: BDXFeedGenerator, client: Any, ingests: Dict[str, int]
+) -> None:
+    previous = str(data_path / CLIENT_KEY / ("%s-2023-01-01.xml" % CLIENT_KEY))
+    generator.write(previous)
+    PyBDX.ReheatSoup(previous, client)
+    # the next day's feed, with unchanged subdivisions
+    generator.write(
+        str(data_path / CLIENT_KEY / ("%s.xml" % CLIENT_KEY)), date="2023-01-02"
+    )
+    ingests["parsed"] = 0
+    bdx = PyBDX(client, analyze=True)
+    assert ingests["parsed"] == 1 and ingests["reused"] > 0
+    assert bdx.metrics.counters["ingest_plans"] == generator.numPlans()
+
+
+@pytest.mark.parametrize("images", [0, 2])
+def test_count_images(data_path: Any, client: Any, images: int) -> None:
+    generator = BDXFeedGenerator(builders=2, subdivisions=2, plans=3, images=images)
+    feed = str(data_path / CLIENT_KEY / ("%s-2023-01-01.xml" % CLIENT_KEY))
+    generator.write(feed)
+    soup = BDXDataSoup(feed, client, stream=True)
+    # an elevation, a floor plan and an interior per image, no placeholders
+    assert PyBDX.countImages(soup) == generator.numPlans() * images * 3
+
+
+def test_columnar_text_is_not_fixed_width() -> None:
+    table = pd.DataFrame(
+        {
+            "description": ["x" * 3000] + ["short"] * 999,
+            "name": ["Café Ñandú"] + [""] * 999,
+            "base_price": range(1000),
+            "actual_price": pd.array([None] + list(range(999)), dtype="Int64"),
+        }
+    )
+    columns = packColumns(table)
+    assert sum(array.nbytes for array in columns.values()) < 64 * 1024
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **columns)
+    buffer.seek(0)
+    with np.load(buffer) as loaded:
+        pd.testing.assert_frame_equal(unpackColumns(loaded), table)
+
+
+def test_columnar_files_match_the_soup(
+    data_path: Any, generator: BDXFeedGenerator, client: Any
+) -> None:
+    generator.write(str(data_path / CLIENT_KEY / ("%s.xml" % CLIENT_KEY)))
+    bdx = PyBDX(client, analyze=True, convert=True)
+    soup = BDXDataSoup(
+        str(data_path / CLIENT_KEY / bdx.xml_file_today), client, stream=True
+    )
+    latest = bdx.npz_files.latest()
+    assert latest is not None
+    for data_key in soup.json:
+        pd.testing.assert_frame_equal(latest[data_key].table(), soup.table(data_key))
+
+
+def test_backfill_skips_the_cache_and_closes_the_history(
+    data_path: Any, generator: BDXFeedGenerator, client: Any, monkeypatch: Any
+) -> None:
+    for day in range(1, 4):
+        feed = "%s-2023-01-0%d.xml" % (CLIENT_KEY, day)
+        generator.write(str(data_path / CLIENT_KEY / feed), price_shift=day)
+    closed: List[PriceHistory] = []
+    close = PriceHistory.close
+
+    def counted(self: PriceHistory) -> None:
+        closed.append(self)
+        close(self)
+
+    monkeypatch.setattr(PriceHistory, "close", counted)
+    bdx = PyBDX(client)
+    assert bdx.backfillPriceHistory() == generator.numPlans() * 3
+    assert SoupCache().entries() == []
+    assert len(closed) == 1
+    with PriceHistory(CLIENT_KEY) as history:
+        assert history.dates() == ["2023-01-01", "2023-01-02", "2023-01-03"]
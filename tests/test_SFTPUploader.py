@@ -0,0 +1,140 @@
+import os
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import paramiko
+import pytest
+
+from lib.FeedGenerator import BDXFeedGenerator
+from lib.PyBDXBuilder import PyBDX
+from lib.SFTPUploader import SFTPUploader, SFTPUploadError
+from tests.conftest import CLIENT_KEY
+
+
+class LocalSFTP:
+    # sftp channel stand-in, on a local directory
+    def __init__(self, root: str, fail: Dict[str, Any]) -> None:
+        self.root = root
+        self.fail = fail
+
+    def path(self, remote: str) -> str:
+        return os.path.join(self.root, remote.lstrip("/"))
+
+    def put(self, local: str, remote: str) -> None:
+        with open(local, "rb") as src, open(self.path(remote), "wb") as dst:
+            dst.write(src.read())
+
+    def posix_rename(self, old: str, new: str) -> None:
+        if "rename" in self.fail:
+            raise self.fail["rename"]
+        os.replace(self.path(old), self.path(new))
+
+    def stat(self, remote: str) -> Any:
+        return os.stat(self.path(remote))
+
+    def remove(self, remote: str) -> None:
+        os.remove(self.path(remote))
+
+    def close(self) -> None:
+        pass
+
+
+class LocalSSH:
+    # ssh connection stand-in, counts the sftp channels it opens
+    def __init__(self, root: str, fail: Dict[str, Any]) -> None:
+        self.root = root
+        self.fail = fail
+        self.channels = 0
+
+    def open_sftp(self) -> LocalSFTP:
+        self.channels += 1
+        return LocalSFTP(self.root, self.fail)
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def server(tmp_path: Any, monkeypatch: Any) -> Dict[str, Any]:
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    state: Dict[str, Any] = {"root": str(remote), "fail": {}, "connections": 0}
+
+    def connect(self: SFTPUploader) -> Any:
+        with self._connecting:
+            if "connect" in state["fail"]:
+                raise state["fail"]["connect"]
+            if self.ssh is None:
+                state["connections"] += 1
+                self.ssh = LocalSSH(state["root"], state["fail"])
+        return self.ssh
+
+    monkeypatch.setattr(SFTPUploader, "connect", connect)
+    return state
+
+
+@pytest.fixture
+def local(tmp_path: Any) -> str:
+    local = tmp_path / "local"
+    local.mkdir()
+    for i in range(4):
+        (local / ("f%d.csv" % i)).write_text("x,y\n" * (1000 * (i + 1)))
+    return str(local)
+
+
+def upload(local: str, files: int = 4) -> Dict[str, Any]:
+    uploader = SFTPUploader(SimpleNamespace(SITE_IP="127.0.0.1"), local)
+    for i in range(files):
+        uploader.add("%s/f%d.csv" % (local, i), "/f%d.csv" % i)
+    return uploader.run()
+
+
+def test_upload_uses_one_connection(server: Dict[str, Any], local: str) -> None:
+    report = upload(local)
+    assert (report["uploaded"], report["failed"]) == (4, 0)
+    assert server["connections"] == 1
+    for i in range(4):
+        with open("%s/f%d.csv" % (server["root"], i)) as remote:
+            with open("%s/f%d.csv" % (local, i)) as src:
+                assert remote.read() == src.read()
+
+
+def test_manifest_skips_unchanged_files(server: Dict[str, Any], local: str) -> None:
+    upload(local)
+    with open("%s/f1.csv" % (local), "a") as changed:
+        changed.write("new\n")
+    os.remove("%s/f3.csv" % (server["root"]))
+    report = upload(local)
+    # f1 changed locally, f3 is gone from the server
+    assert (report["uploaded"], report["skipped"]) == (2, 2)
+
+
+def test_failed_rename_reports_and_removes_temp_files(
+    server: Dict[str, Any], local: str
+) -> None:
+    server["fail"]["rename"] = IOError("Permission denied")
+    report = upload(local, files=2)
+    assert (report["uploaded"], report["failed"]) == (0, 2)
+    assert "/f0.csv: OSError: Permission denied" in report["errors"]
+    assert os.listdir(server["root"]) == []
+    with pytest.raises(SFTPUploadError, match="2 upload"):
+        SFTPUploader.raiseFailed(report)
+
+
+def test_failed_login_is_reported(server: Dict[str, Any], local: str) -> None:
+    server["fail"]["connect"] = paramiko.AuthenticationException("bad password")
+    report = upload(local, files=1)
+    assert report["failed"] == 1
+    assert report["errors"] == ["/f0.csv: AuthenticationException: bad password"]
+    # nothing was uploaded, so nothing is recorded as on the server
+    assert upload(local, files=1)["skipped"] == 0
+
+
+def test_failed_upload_fails_the_run(
+    server: Dict[str, Any], data_path: Any, generator: BDXFeedGenerator, client: Any
+) -> None:
+    generator.write(str(data_path / CLIENT_KEY / ("%s.xml" % CLIENT_KEY)))
+    client.SITE_DUMP_PATH = "/"
+    server["fail"]["connect"] = paramiko.SSHException("connection refused")
+    with pytest.raises(SFTPUploadError, match="SSHException: connection refused"):
+        PyBDX(client, analyze=True, convert=True, upload=True)
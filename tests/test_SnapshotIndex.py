@@ -0,0 +1,41 @@
+from typing import Any, List
+
+from lib.FeedGenerator import BDXFeedGenerator
+from lib.PyBDXBuilder import PyBDX
+from lib.SnapshotIndex import SnapshotIndex
+from tests.conftest import CLIENT_KEY
+
+
+def test_snapshot_types(data_path: Any) -> None:
+    with SnapshotIndex(CLIENT_KEY) as index:
+        assert index.snapshotType("T-2023-01-01.xml") == "xml"
+        assert index.snapshotType("T-2023-01-01.zip") == "zip"
+        assert index.snapshotType("T-plans-2023-01-01.csv") == "plans"
+
+
+def test_one_refresh_per_run(
+    data_path: Any, generator: BDXFeedGenerator, client: Any, monkeypatch: Any
+) -> None:
+    generator.write(str(data_path / CLIENT_KEY / ("%s-2023-01-01.xml" % CLIENT_KEY)))
+    generator.write(str(data_path / CLIENT_KEY / ("%s.xml" % CLIENT_KEY)))
+    refreshed: List[str] = []
+    refresh = SnapshotIndex.refresh
+
+    def counted(self: SnapshotIndex) -> int:
+        refreshed.append(self.client_key)
+        return refresh(self)
+
+    monkeypatch.setattr(SnapshotIndex, "refresh", counted)
+    bdx = PyBDX(client, analyze=True, convert=True)
+    assert len(refreshed) == 1
+    assert bdx.snapshot_index is None
+    # files written by the run are indexed without another refresh
+    types = sorted(datafile.type for datafile in bdx.csv_files.data)
+    assert types == ["builders", "plans", "subdivs"]
+    latest = bdx.xml_files.latest()
+    previous = bdx.xml_files.previous()
+    assert latest is not None and latest["xml"].date == bdx.todaystr
+    assert previous is not None and previous["xml"].date == "2023-01-01"
+    with SnapshotIndex(CLIENT_KEY) as index:
+        assert index.refresh() == 0
+        assert "%s-plans-%s.csv" % (CLIENT_KEY, bdx.todaystr) in index.files(["csv"])
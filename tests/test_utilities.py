@@ -0,0 +1,71 @@
+from typing import Any, List
+
+import pytest
+from phpserialize import dumps  # type: ignore
+
+from lib import utilities as UT
+
+
+def test_name_filter_follows_list_contents() -> None:
+    filter_list = ["The ", " Collection"]
+    assert UT.filterName(filter_list, "The Oak Collection") == "Oak"
+    # changed in place, same size
+    filter_list[1] = " Oak"
+    assert UT.filterName(filter_list, "The Oak Collection") == "Oak Collection"
+    # equal lists share one compiled filter
+    assert UT.getNameFilter(["A", "B"]) is UT.getNameFilter(("A", "B"))
+    assert UT.getNameFilter(["A", "B"]) is not UT.getNameFilter(["B", "A"])
+
+
+def test_wpid_matcher_follows_map_contents() -> None:
+    slugs = {"oak-grove": "11", "elm-park": "12"}
+    assert UT.BDXgetMatchingWPID("1-oak-grove", slugs) == "11"
+    # changed in place, same size
+    slugs["oak-grove"] = "21"
+    assert UT.BDXgetMatchingWPID("1-oak-grove", slugs) == "21"
+    matcher = UT.getWPIDMatcher(slugs)
+    assert UT.getWPIDMatcher(dict(slugs)) is matcher
+    assert UT.getWPIDMatcher(matcher) is matcher
+    # a compiled matcher keeps the map it was compiled from
+    slugs["elm-park"] = "22"
+    assert UT.BDXgetMatchingWPID("elm-park", matcher) == "12"
+    assert UT.BDXgetMatchingWPID("elm-park", slugs) == "22"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        [],
+        [101, 102, -3, 0],
+        ["101", "a b", ""],
+        [1, "two", 3],
+        [{}],
+        [
+            {"type": "elevation", "src": "https://img.example.com/a.jpg", "n": 1},
+            {"type": "floorplan", "src": "b.png", "slug": "plan-1-2"},
+        ],
+        ["Café Ñandú", "日本語", "emoji 🏠"],
+        [{"title": "Maison Élégante", "caption": "Süd"}],
+        [True, False],
+        [1.5, 2.0],
+        [None],
+        [[1, 2], ["a"]],
+        [{"src": None, "ok": True}],
+        [{1: "int key"}],
+    ],
+)
+def test_php_serialize_matches_phpserialize(value: List[Any]) -> None:
+    assert UT.phpSerialize(value) == dumps(value).decode("utf-8")
+
+
+def test_php_serialize_is_memoised() -> None:
+    value = [7001, 7002, "7003"]
+    first = UT.phpSerialize(value)
+    hits = UT.phpSerializeValues.cache_info().hits
+    assert UT.phpSerialize(list(value)) == first == dumps(value).decode("utf-8")
+    assert UT.phpSerializeValues.cache_info().hits == hits + 1
+    images = [{"src": "a.jpg", "slug": "p-1"}]
+    first = UT.phpSerialize(images)
+    hits = UT.phpSerializeRecords.cache_info().hits
+    assert UT.phpSerialize([dict(images[0])]) == first == dumps(images).decode("utf-8")
+    assert UT.phpSerializeRecords.cache_info().hits == hits + 1